@@ -5,7 +5,11 @@ Extracts tenant_id and actor_id from JWT claims for RLS context and audit trail.
 
 from __future__ import annotations
 
+import hashlib
 import os
+import threading
+import time
+from collections import OrderedDict
 
 import jwt
 from fastapi import Depends, HTTPException
@@ -40,6 +44,8 @@ JWT_ISSUER = os.getenv("JWT_ISSUER")  # e.g., "https://auth.yourcompany.com"
 JWT_ENABLED = os.getenv("JWT_ENABLED", "false").lower() == "true"
 JWT_LEEWAY_SECONDS = int(os.getenv("JWT_LEEWAY_SECONDS", "30"))  # Clock skew tolerance
 
+JWT_CACHE_MAX = int(os.getenv("JWT_CACHE_MAX", "0"))  # Verified tokens kept in memory (0 = off)
+
 security = HTTPBearer(auto_error=False)
 
 
@@ -60,6 +66,43 @@ class JWTClaims:
         self.scopes = scopes or []
         self.exp = exp
 
+    def copy(self) -> JWTClaims:
+        """Independent copy, so callers can't mutate a cached instance."""
+        return JWTClaims(
+            tenant_id=self.tenant_id,
+            actor_id=self.actor_id,
+            actor_type=self.actor_type,
+            scopes=list(self.scopes),
+            exp=self.exp,
+        )
+
+
+# Opt-in LRU of already-verified tokens (thread-safe, JWT_CACHE_MAX > 0). Keys are digests
+# of the token plus the verification settings, so a changed key/audience/issuer never hits
+# an old entry; entries are only served before the token's own exp, and always as a copy.
+_VERIFIED_CACHE: OrderedDict[str, JWTClaims] = OrderedDict()
+_VERIFIED_CACHE_LOCK = threading.RLock()
+
+
+def _verified_cache_get(key: str) -> JWTClaims | None:
+    with _VERIFIED_CACHE_LOCK:
+        claims = _VERIFIED_CACHE.get(key)
+        if claims is None:
+            return None
+        if claims.exp is None or time.time() >= claims.exp:
+            _VERIFIED_CACHE.pop(key, None)
+            return None
+        _VERIFIED_CACHE.move_to_end(key)
+        return claims.copy()
+
+
+def _verified_cache_put(key: str, claims: JWTClaims) -> None:
+    with _VERIFIED_CACHE_LOCK:
+        _VERIFIED_CACHE[key] = claims.copy()
+        _VERIFIED_CACHE.move_to_end(key)
+        while len(_VERIFIED_CACHE) > JWT_CACHE_MAX:
+            _VERIFIED_CACHE.popitem(last=False)
+
 
 def verify_jwt(token: str) -> JWTClaims:
     """Verify and decode JWT token.
@@ -80,6 +123,26 @@ def verify_jwt(token: str) -> JWTClaims:
             status_code=500, detail="JWT_SECRET_KEY or JWT_PUBLIC_KEY not configured"
         )
 
+    # Signature checks dominate per-request auth cost; when enabled, skip them for tokens
+    # seen recently
+    cache_key = None
+    if JWT_CACHE_MAX > 0:
+        cache_key = hashlib.blake2b(
+            f"{token}|{key}|{JWT_ALGORITHM}|{JWT_AUDIENCE}|{JWT_ISSUER}".encode(), digest_size=16
+        ).hexdigest()
+        cached = _verified_cache_get(cache_key)
+        if cached is not None:
+            logger.info(
+                "JWT verified",
+                extra_fields={
+                    "tenant_id": cached.tenant_id,
+                    "actor_id": cached.actor_id,
+                    "scopes": cached.scopes,
+                    "cached": True,
+                },
+            )
+            return cached
+
     try:
         # Decode and verify token with leeway for clock skew
         payload = jwt.decode(
@@ -133,9 +196,12 @@ def verify_jwt(token: str) -> JWTClaims:
             extra_fields={"tenant_id": tenant_id, "actor_id": actor_id, "scopes": scopes},
         )
 
-        return JWTClaims(
+        claims = JWTClaims(
             tenant_id=tenant_id, actor_id=actor_id, actor_type=actor_type, scopes=scopes, exp=exp
         )
+        if cache_key is not None and isinstance(exp, int | float):
+            _verified_cache_put(cache_key, claims)
+        return claims
 
     except jwt.ExpiredSignatureError:
         raise HTTPException(status_code=401, detail="JWT token has expired") from None
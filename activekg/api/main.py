@@ -27,6 +27,7 @@ from fastapi import (
     Response,
     UploadFile,
 )
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.responses import HTMLResponse, PlainTextResponse, StreamingResponse
 from pydantic import BaseModel, Field
 from starlette.middleware.base import BaseHTTPMiddleware
@@ -42,6 +43,7 @@ from activekg.common.logger import clear_log_context, get_enhanced_logger, set_l
 from activekg.common.metrics import get_redis_client, metrics
 from activekg.common.validation import (
     AskRequest,
+    EdgeBatchCreate,
     EdgeCreate,
     HealthCheckResponse,
     KGSearchRequest,
@@ -175,6 +177,11 @@ DSN = env_str(
 EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "sentence-transformers")
 EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "all-MiniLM-L6-v2")
 WEIGHTED_SEARCH_CANDIDATE_FACTOR = float(os.getenv("WEIGHTED_SEARCH_CANDIDATE_FACTOR", "2.0"))
+# Load the embedding model in the background at startup so the first create/search request
+# doesn't pay for it; /health reports progress under components.embedder
+EMBEDDING_WARMUP = os.getenv("EMBEDDING_WARMUP", "true").lower() == "true"
+# Vectors kept in the in-process LRU keyed by text hash (~1.5KB each at 384 dims; 0 = off)
+EMBEDDING_CACHE_SIZE = int(os.getenv("EMBEDDING_CACHE_SIZE", "2048"))
 
 # LLM provider for /ask endpoint (optional, falls back gracefully)
 LLM_BACKEND = os.getenv("LLM_BACKEND", "groq")  # "openai", "groq", or "litellm"
@@ -226,6 +233,11 @@ ASK_USE_RERANKER = os.getenv("ASK_USE_RERANKER", "true").lower() == "true"
 RERANK_SKIP_TOPSIM = float(os.getenv("RERANK_SKIP_TOPSIM", "0.80"))
 
 MAX_REQUEST_SIZE = int(os.getenv("MAX_REQUEST_SIZE_BYTES", str(10 * 1024 * 1024)))
+# Opt-in gzip for responses at least GZIP_MIN_SIZE_BYTES large, for clients sending
+# Accept-Encoding: gzip. Off by default: whether SSE (text/event-stream) responses are left
+# uncompressed depends on the installed Starlette version, which is not pinned.
+GZIP_ENABLED = os.getenv("GZIP_ENABLED", "false").lower() == "true"
+GZIP_MIN_SIZE = int(os.getenv("GZIP_MIN_SIZE_BYTES", "1000"))
 
 
 class BodySizeLimitMiddleware(BaseHTTPMiddleware):
@@ -350,6 +362,8 @@ class ApiErrorMetricsMiddleware(BaseHTTPMiddleware):
 
 
 app.add_middleware(ApiErrorMetricsMiddleware)
+if GZIP_ENABLED:
+    app.add_middleware(GZipMiddleware, minimum_size=GZIP_MIN_SIZE)
 logger = get_enhanced_logger(__name__)
 
 # Lazy initialization for test mode (allows import without DB connection)
@@ -367,7 +381,9 @@ if TEST_MODE:
 else:
     # Normal mode: eager initialization
     repo = GraphRepository(DSN, candidate_factor=WEIGHTED_SEARCH_CANDIDATE_FACTOR)
-    embedder = EmbeddingProvider(backend=EMBEDDING_BACKEND, model_name=EMBEDDING_MODEL)
+    embedder = EmbeddingProvider(
+        backend=EMBEDDING_BACKEND, model_name=EMBEDDING_MODEL, cache_size=EMBEDDING_CACHE_SIZE
+    )
     pattern_store = PatternStore(DSN)
     trigger_engine = TriggerEngine(pattern_store, repo)
     scheduler = None
@@ -528,6 +544,19 @@ def startup_event():
     # Auto-enable vector index if not present
     repo.ensure_vector_index()
 
+    if EMBEDDING_WARMUP and embedder is not None:
+
+        def _warm_embedder(provider: EmbeddingProvider) -> None:
+            try:
+                provider.load()
+                logger.info("Embedding model loaded", extra_fields={"model": EMBEDDING_MODEL})
+            except Exception as e:
+                logger.warning("Embedding model warm-up failed", extra_fields={"error": str(e)})
+
+        threading.Thread(
+            target=_warm_embedder, args=(embedder,), name="embedder-warmup", daemon=True
+        ).start()
+
     # Start refresh scheduler (only if RUN_SCHEDULER=true)
     global scheduler
     if RUN_SCHEDULER:
@@ -579,7 +608,14 @@ def health() -> HealthCheckResponse:
         timestamp=now,
         version=APP_VERSION,
         uptime_seconds=0.0,
-        components={"db": {"status": "unknown"}},
+        components={
+            "db": {"status": "unknown"},
+            "embedder": {
+                "status": "loaded" if embedder is not None and embedder.is_loaded else "not_loaded",
+                "backend": EMBEDDING_BACKEND,
+                "model": EMBEDDING_MODEL,
+            },
+        },
         llm_backend=LLM_BACKEND if LLM_ENABLED and llm else None,
         llm_model=LLM_MODEL if LLM_ENABLED and llm else None,
     )
@@ -1252,56 +1288,88 @@ async def prometheus_metrics():
 
 def _background_embed(node_id: str, tenant_id: str | None = None):
     """Background task to embed a node and persist embedding/drift/history."""
+    _background_embed_many([(node_id, tenant_id)])
+
+
+def _background_embed_failed(node_id: str, tenant_id: str | None, e: Exception) -> None:
+    logger.error("Background embed failed", extra_fields={"node_id": node_id, "error": str(e)})
+    try:
+        assert repo is not None
+        repo.mark_embedding_failed(node_id, str(e), tenant_id=tenant_id)
+    except Exception:
+        pass
+
+
+def _background_embed_many(items: list[tuple[str, str | None]]):
+    """Background task to embed several nodes with a single encoder call.
+
+    Each (node_id, tenant_id) is then persisted exactly as _background_embed does; a failure
+    marks only the affected node(s) as failed.
+    """
     assert repo is not None, "GraphRepository not initialized"
     assert embedder is not None, "EmbeddingProvider not initialized"
+    pending: list[tuple[str, str | None, Node, str]] = []
+    for node_id, tenant_id in items:
+        try:
+            n = repo.get_node(node_id, tenant_id=tenant_id)
+            if not n:
+                continue
+            text = repo.build_embedding_text(n)
+            if not text:
+                continue
+            pending.append((node_id, tenant_id, n, text))
+        except Exception as e:
+            _background_embed_failed(node_id, tenant_id, e)
+    if not pending:
+        return
+
     try:
-        n = repo.get_node(node_id, tenant_id=tenant_id)
-        if not n:
-            return
-        text = repo.build_embedding_text(n)
-        if not text:
-            return
-        extraction_version = os.getenv("EXTRACTION_VERSION", "1.0.0")
-        node_version = (n.props or {}).get("extraction_version")
-        content_hash = None
-        if (not (n.props or {}).get("content_hash")) or (node_version != extraction_version):
-            content_hash = hashlib.sha256(text.encode("utf-8")).hexdigest()
-        old = n.embedding
-        new = embedder.encode([text])[0]
-        if old is None:
-            drift = 0.0
-        else:
-            denom = (float((old**2).sum()) ** 0.5) * (float((new**2).sum()) ** 0.5)
-            drift = 0.0 if denom == 0 else 1.0 - float((old @ new) / denom)
-        ts = datetime.now(timezone.utc).isoformat()
-        repo.update_node_embedding(
-            node_id,
-            new,
-            drift,
-            ts,
-            tenant_id=n.tenant_id,
-            content_hash=content_hash,
-            extraction_version=extraction_version,
-        )
-        repo.write_embedding_history(
-            node_id, drift, embedding_ref=n.payload_ref, tenant_id=n.tenant_id
-        )
-        drift_threshold = n.refresh_policy.get("drift_threshold", 0.1) if n.refresh_policy else 0.1
-        if drift > drift_threshold:
-            repo.append_event(
+        vectors = embedder.encode([text for _, _, _, text in pending])
+    except Exception as e:
+        for node_id, tenant_id, _, _ in pending:
+            _background_embed_failed(node_id, tenant_id, e)
+        return
+
+    extraction_version = os.getenv("EXTRACTION_VERSION", "1.0.0")
+    for (node_id, tenant_id, n, text), new in zip(pending, vectors, strict=True):
+        try:
+            node_version = (n.props or {}).get("extraction_version")
+            content_hash = None
+            if (not (n.props or {}).get("content_hash")) or (node_version != extraction_version):
+                content_hash = hashlib.sha256(text.encode("utf-8")).hexdigest()
+            old = n.embedding
+            if old is None:
+                drift = 0.0
+            else:
+                denom = (float((old**2).sum()) ** 0.5) * (float((new**2).sum()) ** 0.5)
+                drift = 0.0 if denom == 0 else 1.0 - float((old @ new) / denom)
+            ts = datetime.now(timezone.utc).isoformat()
+            repo.update_node_embedding(
                 node_id,
-                "refreshed",
-                {"drift_score": drift, "last_refreshed": ts, "auto_embed": True},
+                new,
+                drift,
+                ts,
                 tenant_id=n.tenant_id,
-                actor_id="auto_embed",
-                actor_type="system",
+                content_hash=content_hash,
+                extraction_version=extraction_version,
             )
-    except Exception as e:
-        logger.error("Background embed failed", extra_fields={"node_id": node_id, "error": str(e)})
-        try:
-            repo.mark_embedding_failed(node_id, str(e), tenant_id=tenant_id)
-        except Exception:
-            pass
+            repo.write_embedding_history(
+                node_id, drift, embedding_ref=n.payload_ref, tenant_id=n.tenant_id
+            )
+            drift_threshold = (
+                n.refresh_policy.get("drift_threshold", 0.1) if n.refresh_policy else 0.1
+            )
+            if drift > drift_threshold:
+                repo.append_event(
+                    node_id,
+                    "refreshed",
+                    {"drift_score": drift, "last_refreshed": ts, "auto_embed": True},
+                    tenant_id=n.tenant_id,
+                    actor_id="auto_embed",
+                    actor_type="system",
+                )
+        except Exception as e:
+            _background_embed_failed(node_id, tenant_id, e)
 
 
 @app.post("/nodes", response_model=None, dependencies=[Depends(require_scope("kg:write"))])
@@ -1513,6 +1581,8 @@ def create_nodes_batch(
     results: list[dict[str, Any]] = []
     created = 0
     failed = 0
+    # In-process embeds are collected and run as one background task (one encoder call)
+    background_embeds: list[tuple[str, str | None]] = []
 
     for item in batch.nodes:
         tenant_id = effective_tenant_id
@@ -1569,7 +1639,7 @@ def create_nodes_batch(
                     repo.mark_embedding_queued(node_id, tenant_id=tenant_id)
                     embedding_status = "queued"
                 else:
-                    background_tasks.add_task(_background_embed, node_id, tenant_id)
+                    background_embeds.append((node_id, tenant_id))
             else:
                 repo.mark_embedding_skipped(node_id, "auto_embed_disabled", tenant_id=tenant_id)
                 embedding_status = "skipped"
@@ -1596,6 +1666,8 @@ def create_nodes_batch(
             if not batch.continue_on_error:
                 break
 
+    if background_embeds:
+        background_tasks.add_task(_background_embed_many, background_embeds)
     return {"created": created, "failed": failed, "results": results}
 
 
@@ -2954,9 +3026,13 @@ async def ask_question(
 
         # 5. LLM call with optimized prompt and parameters (with simple context-aware cache)
         system_message, prompt = build_strict_citation_prompt(context_items, request.question)
-        # Cache key based on tenant + question + context node IDs + LLM path
+        # Cache key based on tenant + question + context node IDs + LLM path, digested with
+        # BLAKE2b so LRU entries hold a fixed 32-char key instead of the full question + IDs
         ctx_ids = ",".join([n.id for n, _ in filtered_results])
-        cache_key = f"ask::{request.tenant_id or ''}::{request.question}::{ctx_ids}::{llm_path}"
+        cache_key = hashlib.blake2b(
+            f"ask::{request.tenant_id or ''}::{request.question}::{ctx_ids}::{llm_path}".encode(),
+            digest_size=16,
+        ).hexdigest()
         cached = _ask_cache_get(cache_key)
         if cached is not None:
             return cached
@@ -3315,6 +3391,52 @@ def create_edge(
         raise HTTPException(status_code=500, detail=f"Edge creation failed: {str(ex)}")
 
 
+@app.post("/edges/batch", response_model=None, dependencies=[Depends(require_scope("kg:write"))])
+def create_edges_batch(
+    batch: EdgeBatchCreate,
+    _rl: None = Depends(require_rate_limit("default")),
+    claims: JWTClaims | None = Depends(get_jwt_claims),
+):
+    """Create multiple relationships in a single request (all-or-nothing).
+
+    Security:
+        When JWT_ENABLED=true, tenant_id is derived from JWT claims (secure).
+        When JWT_ENABLED=false (dev mode), tenant_id can be provided per batch or per edge,
+        but every edge in a batch must resolve to the same tenant.
+    """
+    assert repo is not None, "GraphRepository not initialized"
+    # Batch size is capped by EdgeBatchCreate (max 500 edges, 422 above that)
+    if JWT_ENABLED and claims:
+        effective_tenant_id = claims.tenant_id
+    else:
+        effective_tenant_id = batch.tenant_id or "default"
+
+    edges: list[Edge] = []
+    for item in batch.edges:
+        tenant_id = effective_tenant_id
+        if not JWT_ENABLED and not batch.tenant_id:
+            tenant_id = item.tenant_id or "default"
+        edges.append(
+            Edge(src=item.src, rel=item.rel, dst=item.dst, props=item.props, tenant_id=tenant_id)
+        )
+    # One tenant means one transaction, so any failure rejects the whole batch
+    if len({e.tenant_id for e in edges}) > 1:
+        raise HTTPException(status_code=400, detail="All edges in a batch must share one tenant")
+
+    try:
+        created = repo.create_edges(edges)
+    except ValueError as ex:
+        # 400, not 404: clients read 404 as "no /edges/batch route" and fall back to /edges
+        raise HTTPException(status_code=400, detail=str(ex))
+    except Exception as ex:
+        logger.error("Edge batch creation failed", extra_fields={"error": str(ex)})
+        raise HTTPException(status_code=500, detail=f"Edge creation failed: {str(ex)}")
+    return {
+        "created": len(created),
+        "results": [{"src": e.src, "rel": e.rel, "dst": e.dst} for e in created],
+    }
+
+
 @app.post("/triggers", response_model=None)
 def register_trigger_pattern(
     pattern: dict[str, Any],
@@ -388,3 +388,14 @@ class EdgeCreate(BaseModel):
             raise ValueError("Relationship type must be under 100 characters")
         # Uppercase convention validation (optional, can be removed if not needed)
         return v.strip()
+
+
+class EdgeBatchCreate(BaseModel):
+    """Validated batch edge creation request."""
+
+    edges: list[EdgeCreate] = Field(..., min_length=1, max_length=500)
+    tenant_id: str | None = Field(
+        None,
+        max_length=100,
+        description="Tenant ID (dev mode only, overridden by JWT in production)",
+    )
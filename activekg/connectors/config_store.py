@@ -13,12 +13,16 @@ from __future__ import annotations
 import json
 import logging
 import os
+from collections.abc import Iterator, Sequence
+from contextlib import contextmanager
 from datetime import datetime
 from typing import Any, cast
 
 import psycopg
 from prometheus_client import Counter
 from psycopg.rows import dict_row
+from psycopg.types.json import set_json_loads
+from psycopg_pool import ConnectionPool
 
 from activekg.connectors.encryption import get_encryption, sanitize_config_for_logging
 from activekg.connectors.schemas import (
@@ -33,6 +37,19 @@ from .types import RotationBatchResultTD
 
 logger = logging.getLogger(__name__)
 
+try:
+    import orjson
+except ImportError:  # optional: faster config (de)serialization
+    orjson = None
+
+
+def _json_dumps(obj: Any) -> str:
+    # str, not bytes: psycopg would send bytes as bytea rather than jsonb
+    if orjson is not None:
+        return orjson.dumps(obj).decode()
+    return json.dumps(obj)
+
+
 # Redis pub/sub (optional - graceful degradation if not available)
 try:
     import redis
@@ -111,15 +128,35 @@ def validate_connector_config(provider: str, config: dict[str, Any]) -> dict[str
 class ConnectorConfigStore:
     """Database store for connector configurations with encryption."""
 
-    def __init__(self, dsn: str, cache_ttl_seconds: int = 300, redis_url: str | None = None):
+    _UPSERT_SQL = """
+        INSERT INTO connector_configs (tenant_id, provider, config_json, enabled, key_version)
+        VALUES (%s, %s, %s, %s, %s)
+        ON CONFLICT (tenant_id, provider)
+        DO UPDATE SET
+            config_json = EXCLUDED.config_json,
+            enabled = EXCLUDED.enabled,
+            key_version = EXCLUDED.key_version,
+            updated_at = NOW()
+    """
+
+    def __init__(
+        self,
+        dsn: str,
+        cache_ttl_seconds: int = 300,
+        redis_url: str | None = None,
+        *,
+        pool: ConnectionPool | None = None,
+    ):
         """Initialize config store.
 
         Args:
             dsn: PostgreSQL connection string
             cache_ttl_seconds: How long to cache configs in memory (default: 5 minutes)
             redis_url: Optional Redis URL for pub/sub cache invalidation
+            pool: Optional shared connection pool; without one, each operation connects
         """
         self.dsn = dsn
+        self.pool = pool
         self.cache_ttl = cache_ttl_seconds
         self.encryption = get_encryption()
 
@@ -137,14 +174,30 @@ class ConnectorConfigStore:
                 logger.warning(f"Failed to connect to Redis for pub/sub: {e}")
                 self.redis_client = None
 
-    def _get_connection(self) -> psycopg.Connection:
-        """Get database connection.
+    @contextmanager
+    def _get_connection(self) -> Iterator[psycopg.Connection]:
+        """Get database connection (dict rows), from the pool when one was given.
 
-        Returns:
+        Yields:
             psycopg connection
         """
-        # dict_row type doesn't match RowFactory signature exactly, but works at runtime
-        return psycopg.connect(self.dsn, row_factory=dict_row)  # type: ignore[arg-type]
+        if self.pool is None:
+            # dict_row type doesn't match RowFactory signature exactly, but works at runtime
+            with psycopg.connect(self.dsn, row_factory=dict_row) as conn:  # type: ignore[arg-type]
+                if orjson is not None:
+                    # config_json (jsonb) is parsed with orjson on connections the store owns
+                    set_json_loads(orjson.loads, conn)
+                yield conn
+            return
+
+        with self.pool.connection() as conn:
+            # The pool may be shared with tuple-row users; restore its factory on return
+            row_factory = conn.row_factory
+            conn.row_factory = dict_row  # type: ignore[assignment]
+            try:
+                yield conn
+            finally:
+                conn.row_factory = row_factory
 
     def _is_cache_valid(self, cache_entry: tuple[dict[str, Any], datetime]) -> bool:
         """Check if cache entry is still valid.
@@ -172,7 +225,7 @@ class ConnectorConfigStore:
             return
 
         try:
-            message = json.dumps(
+            message = _json_dumps(
                 {"tenant_id": tenant_id, "provider": provider, "operation": operation}
             )
             self.redis_client.publish("connector:config:changed", message)
@@ -283,20 +336,11 @@ class ConnectorConfigStore:
             with self._get_connection() as conn:
                 with conn.cursor() as cur:
                     cur.execute(
-                        """
-                        INSERT INTO connector_configs (tenant_id, provider, config_json, enabled, key_version)
-                        VALUES (%s, %s, %s, %s, %s)
-                        ON CONFLICT (tenant_id, provider)
-                        DO UPDATE SET
-                            config_json = EXCLUDED.config_json,
-                            enabled = EXCLUDED.enabled,
-                            key_version = EXCLUDED.key_version,
-                            updated_at = NOW()
-                        """,
+                        self._UPSERT_SQL,
                         (
                             tenant_id,
                             provider,
-                            json.dumps(encrypted_config),
+                            _json_dumps(encrypted_config),
                             enabled,
                             active_key_version,
                         ),
@@ -319,6 +363,50 @@ class ConnectorConfigStore:
             logger.error(f"Failed to save config: {e}")
             return False
 
+    def upsert_many(self, configs: Sequence[tuple[str, str, dict[str, Any], bool]]) -> bool:
+        """Create or update several connector configs in one transaction.
+
+        Same per-row behavior as upsert, but the INSERTs share one pipelined executemany
+        (a single round-trip, one prepared statement) instead of a connection each.
+        All-or-nothing.
+
+        Args:
+            configs: (tenant_id, provider, config, enabled) tuples
+
+        Returns:
+            True if successful
+        """
+        try:
+            active_key_version = self.encryption.active_version
+            params = [
+                (
+                    tenant_id,
+                    provider,
+                    _json_dumps(
+                        self.encryption.encrypt_config(validate_connector_config(provider, config))
+                    ),
+                    enabled,
+                    active_key_version,
+                )
+                for tenant_id, provider, config, enabled in configs
+            ]
+
+            with self._get_connection() as conn:
+                with conn.cursor() as cur:
+                    cur.executemany(self._UPSERT_SQL, params)
+                    conn.commit()
+
+            for tenant_id, provider, _, _ in configs:
+                self._cache.pop((tenant_id, provider), None)
+                self._publish_invalidation(tenant_id, provider, "upsert")
+
+            logger.info(f"Configs saved: {len(configs)}")
+            return True
+
+        except Exception as e:
+            logger.error(f"Failed to save configs: {e}")
+            return False
+
     def set_enabled(self, tenant_id: str, provider: str, enabled: bool) -> bool:
         """Enable or disable connector config.
 
@@ -559,7 +647,7 @@ class ConnectorConfigStore:
                                 WHERE tenant_id = %s AND provider = %s
                                 """,
                                 (
-                                    json.dumps(re_encrypted_config),
+                                    _json_dumps(re_encrypted_config),
                                     active_version,
                                     tenant_id,
                                     provider,
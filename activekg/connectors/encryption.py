@@ -17,11 +17,17 @@ from __future__ import annotations
 
 import logging
 import os
+import struct
 from typing import Any
 
 from cryptography.fernet import Fernet
 from prometheus_client import Counter
 
+try:
+    from rfernet import Fernet as RFernet
+except ImportError:  # optional: Rust Fernet, several times faster on small secrets
+    RFernet = None
+
 logger = logging.getLogger(__name__)
 
 # Prometheus metrics
@@ -39,6 +45,48 @@ SECRET_FIELDS = [
     "credentials",
 ]
 
+# encrypt_config stores all of a config's secrets as one token under SECRETS_BLOB_KEY, with
+# the field names (in blob order) under SECRETS_FIELDS_KEY. Configs written before that
+# carry one token per secret field; decrypt_config reads both.
+SECRETS_BLOB_KEY = "__secrets_blob__"
+SECRETS_FIELDS_KEY = "__secret_fields__"
+_LEN = struct.Struct(">I")
+
+# New ciphertexts are tagged "v<KEK version>:<Fernet token>" so decryption goes straight to
+# the right KEK. Fernet tokens are URL-safe base64 (no ':'), so untagged legacy tokens are
+# unambiguous and still decrypt through the key_version hint / try-every-KEK fallback.
+#
+# Both formats are one-way: releases before them can't read tagged values or
+# SECRETS_BLOB_KEY configs, so rolling back needs configs re-written in the old per-field
+# format (see docs/operations/connectors.md, "Rolling back").
+
+
+class _RFernetCipher:
+    """rfernet cipher behind cryptography's bytes-in/bytes-out Fernet interface.
+
+    rfernet's encrypt() returns a str token and its decrypt() takes one.
+    """
+
+    def __init__(self, kek: str):
+        self._fernet = RFernet(kek)
+
+    def encrypt(self, data: bytes) -> bytes:
+        token = self._fernet.encrypt(data)
+        return token.encode() if isinstance(token, str) else token
+
+    def decrypt(self, token: bytes) -> bytes:
+        return self._fernet.decrypt(token.decode())
+
+
+def _make_cipher(kek: str) -> Fernet:
+    """Fernet cipher for a KEK, backed by rfernet when installed.
+
+    Both implement the Fernet spec, so tokens from either decrypt with the other.
+    """
+    if RFernet is not None:
+        return _RFernetCipher(kek)  # type: ignore[return-value]
+    return Fernet(kek.encode())
+
 
 def load_keks() -> dict[int, Fernet]:
     """Load all available KEKs from environment variables.
@@ -57,7 +105,7 @@ def load_keks() -> dict[int, Fernet]:
         kek_str = os.getenv(kek_env)
         if kek_str:
             try:
-                keks[version] = Fernet(kek_str.encode())
+                keks[version] = _make_cipher(kek_str)
                 logger.debug(f"Loaded KEK version {version}")
             except Exception as e:
                 logger.error(f"Invalid {kek_env}: {e}")
@@ -68,7 +116,7 @@ def load_keks() -> dict[int, Fernet]:
         legacy_kek = os.getenv("CONNECTOR_KEK")
         if legacy_kek:
             try:
-                keks[1] = Fernet(legacy_kek.encode())
+                keks[1] = _make_cipher(legacy_kek)
                 logger.debug("Loaded legacy CONNECTOR_KEK as V1")
             except Exception as e:
                 raise ValueError(f"Invalid CONNECTOR_KEK: {e}")
@@ -133,13 +181,15 @@ class SecretEncryption:
             plaintext: Plain text secret
 
         Returns:
-            Base64-encoded ciphertext
+            Base64-encoded ciphertext, tagged with the active KEK version
         """
         if not plaintext:
             return plaintext
 
-        ciphertext = self.active_cipher.encrypt(plaintext.encode())
-        return ciphertext.decode()
+        return self._encrypt_tagged(plaintext.encode())
+
+    def _encrypt_tagged(self, plaintext: bytes) -> str:
+        return f"v{self.active_version}:{self.active_cipher.encrypt(plaintext).decode()}"
 
     def decrypt_value(self, ciphertext: str, key_version: int | None = None) -> str:
         """Decrypt a single secret value with KEK fallback support.
@@ -159,23 +209,43 @@ class SecretEncryption:
         if not ciphertext:
             return ciphertext
 
+        return self._decrypt_token(ciphertext.encode(), key_version).decode()
+
+    def _decrypt_token(self, token: bytes, key_version: int | None) -> bytes:
+        """Decrypt a Fernet token, trying key_version first and then every KEK.
+
+        Tagged tokens ("v<N>:...") are decrypted with KEK vN alone.
+        """
+        tag, sep, rest = token.partition(b":")
+        if sep and tag[:1] == b"v" and tag[1:].isdigit():
+            version = int(tag[1:])
+            if version not in self.keks:
+                logger.error(f"Secret was encrypted with KEK v{version}, which is not loaded")
+                raise ValueError(f"KEK v{version} not available")
+            try:
+                return self.keks[version].decrypt(rest)
+            except Exception:
+                logger.error(f"Failed to decrypt secret with its KEK v{version}")
+                raise ValueError(f"Decryption failed with KEK v{version}")
+
         # Try specified version first if provided
         if key_version and key_version in self.keks:
             try:
-                plaintext = self.keks[key_version].decrypt(ciphertext.encode())
-                return plaintext.decode()
+                return self.keks[key_version].decrypt(token)
             except Exception:
                 logger.warning(
                     f"Failed to decrypt with specified KEK v{key_version}, trying fallback"
                 )
 
-        # Fallback: try all available KEKs
+        # Fallback: try the other KEKs (the specified one has already failed)
         for version, cipher in self.keks.items():
+            if key_version and version == key_version:
+                continue
             try:
-                plaintext = cipher.decrypt(ciphertext.encode())
-                if key_version and version != key_version:
+                plaintext = cipher.decrypt(token)
+                if key_version:
                     logger.info(f"Decrypted with KEK v{version} (expected v{key_version})")
-                return plaintext.decode()
+                return plaintext
             except Exception:
                 continue
 
@@ -190,21 +260,32 @@ class SecretEncryption:
     ) -> dict[str, Any]:
         """Encrypt secret fields in connector config.
 
+        All present secret fields are packed (length-prefixed) into one buffer and encrypted
+        with a single Fernet call, rather than one token per field.
+
         Args:
             config: Connector config dict
             secret_fields: List of field names to encrypt (default: SECRET_FIELDS)
 
         Returns:
-            Config with encrypted secret fields
+            Config with the secret fields replaced by SECRETS_BLOB_KEY / SECRETS_FIELDS_KEY
         """
         if secret_fields is None:
             secret_fields = SECRET_FIELDS
 
         encrypted = config.copy()
 
-        for field in secret_fields:
-            if field in encrypted and encrypted[field]:
-                encrypted[field] = self.encrypt_value(encrypted[field])
+        fields = [field for field in secret_fields if encrypted.get(field)]
+        if not fields:
+            return encrypted
+
+        parts = []
+        for field in fields:
+            value = encrypted.pop(field).encode()
+            parts.append(_LEN.pack(len(value)))
+            parts.append(value)
+        encrypted[SECRETS_BLOB_KEY] = self._encrypt_tagged(b"".join(parts))
+        encrypted[SECRETS_FIELDS_KEY] = fields
 
         return encrypted
 
@@ -229,7 +310,32 @@ class SecretEncryption:
 
         decrypted = config.copy()
 
+        blob_fields: list[str] = []
+        if SECRETS_BLOB_KEY in decrypted:
+            blob_fields = list(decrypted.get(SECRETS_FIELDS_KEY) or [])
+            try:
+                blob = self._decrypt_token(decrypted[SECRETS_BLOB_KEY].encode(), key_version)
+                values: dict[str, str] = {}
+                offset = 0
+                for field in blob_fields:
+                    (length,) = _LEN.unpack_from(blob, offset)
+                    offset += _LEN.size
+                    values[field] = blob[offset : offset + length].decode()
+                    offset += length
+            except Exception:
+                logger.error(f"Failed to decrypt secrets blob with KEK v{key_version or 'any'}")
+                for field in blob_fields:
+                    connector_decrypt_failures_total.labels(field=field).inc()
+                # Keep encrypted blob, let caller handle
+            else:
+                del decrypted[SECRETS_BLOB_KEY]
+                decrypted.pop(SECRETS_FIELDS_KEY, None)
+                decrypted.update(values)
+
+        # Legacy configs: one token per secret field
         for field in secret_fields:
+            if field in blob_fields:
+                continue
             if field in decrypted and decrypted[field]:
                 try:
                     decrypted[field] = self.decrypt_value(decrypted[field], key_version=key_version)
@@ -251,6 +357,9 @@ _encryption: SecretEncryption | None = None
 def get_encryption() -> SecretEncryption:
     """Get global encryption instance.
 
+    KEKs are read from the environment and their ciphers built once per process; use this
+    rather than constructing SecretEncryption() per request.
+
     Returns:
         SecretEncryption instance
 
@@ -1,5 +1,8 @@
 from __future__ import annotations
 
+import hashlib
+import threading
+from collections import OrderedDict
 from collections.abc import Iterable
 
 import numpy as np
@@ -8,22 +11,67 @@ from activekg.common.logger import get_enhanced_logger
 
 
 class EmbeddingProvider:
-    """Simple wrapper for embeddings. Supports 'sentence-transformers' or 'ollama' backends.
+    """Simple wrapper for embeddings. Supports 'sentence-transformers', 'onnx' or 'ollama' backends.
 
     This is a thin interface; wire in your model of choice.
+
+    'onnx' runs the same model under ONNX Runtime on CPU; ``model_name`` may be a hub id
+    (exported on load) or a directory from ``optimum-cli export onnx``, optionally
+    int8-quantized with ``optimum-cli onnxruntime quantize``.
+
+    ``device`` ("cpu", "cuda", "cuda:N" or "auto") only applies to sentence-transformers;
+    ``batch_size`` defaults to 64 on CUDA and 32 on CPU. ``start_pool()`` shards encoding
+    across several devices for bulk jobs.
+
+    ``cache_size`` > 0 keeps that many vectors in an in-process LRU keyed by a hash of the
+    text, so repeated texts (re-seeded nodes, repeated queries) skip the encoder. The model
+    is fixed per provider, so the text alone identifies a vector.
     """
 
-    def __init__(self, backend: str = "sentence-transformers", model_name: str | None = None):
+    def __init__(
+        self,
+        backend: str = "sentence-transformers",
+        model_name: str | None = None,
+        device: str = "cpu",
+        batch_size: int | None = None,
+        cache_size: int = 0,
+    ):
         self.backend = backend
-        self.model_name = model_name or (
-            "all-MiniLM-L6-v2" if backend == "sentence-transformers" else "nomic-embed-text"
-        )
+        self.model_name = model_name or {
+            "sentence-transformers": "all-MiniLM-L6-v2",
+            "onnx": "sentence-transformers/all-MiniLM-L6-v2",
+        }.get(backend, "nomic-embed-text")
+        self.device = device
+        self.batch_size = batch_size
         self.logger = get_enhanced_logger(__name__)
         self._model = None
+        self._tokenizer = None
+        self._pool = None
+        # Set once the model is fully loaded (and moved/cast); guarded so a startup warm-up
+        # and a first request never load it twice
+        self._loaded = False
+        self._load_lock = threading.Lock()
+        self.cache_size = cache_size
+        self._cache: OrderedDict[bytes, np.ndarray] = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._loaded
+
+    def load(self) -> None:
+        """Load the model now instead of on the first encode() (e.g. at API startup)."""
+        self._ensure_model()
 
     def _ensure_model(self):
-        if self._model is not None:
+        if self._loaded:
             return
+        with self._load_lock:
+            if not self._loaded:
+                self._load_model()
+                self._loaded = True
+
+    def _load_model(self):
         if self.backend == "sentence-transformers":
             try:
                 from sentence_transformers import SentenceTransformer
@@ -45,6 +93,39 @@ class EmbeddingProvider:
             self._model = SentenceTransformer(
                 self.model_name, device="cpu", model_kwargs=model_kwargs
             )
+            if self.device == "auto":
+                self.device = "cuda" if torch.cuda.is_available() else "cpu"
+            if self.device != "cpu":
+                self._model.to(self.device)
+            if self.device.startswith("cuda"):
+                # Reduced-precision inference roughly doubles encoder throughput on GPU;
+                # encode() still returns float32, so stored vectors are unchanged in format
+                if torch.cuda.is_bf16_supported():
+                    self._model.to(torch.bfloat16)
+                else:
+                    self._model.half()
+            if self.batch_size is None:
+                # GPU throughput keeps climbing to ~64; larger CPU batches mostly add padding
+                self.batch_size = 64 if self.device.startswith("cuda") else 32
+        elif self.backend == "onnx":
+            try:
+                from optimum.onnxruntime import ORTModelForFeatureExtraction
+                from transformers import AutoTokenizer
+            except Exception as e:
+                raise ImportError("optimum[onnxruntime] not installed") from e
+            import os
+
+            kwargs = {}
+            if not os.path.isdir(self.model_name):
+                kwargs["export"] = True
+            elif os.path.exists(os.path.join(self.model_name, "model_quantized.onnx")):
+                kwargs["file_name"] = "model_quantized.onnx"
+            self._tokenizer = AutoTokenizer.from_pretrained(self.model_name)
+            self._model = ORTModelForFeatureExtraction.from_pretrained(
+                self.model_name, provider="CPUExecutionProvider", **kwargs
+            )
+            if self.batch_size is None:
+                self.batch_size = 32
         elif self.backend == "ollama":
             try:
                 import ollama
@@ -54,19 +135,87 @@ class EmbeddingProvider:
         else:
             raise ValueError(f"Unsupported backend: {self.backend}")
 
+    def start_pool(self, target_devices: list[str]) -> bool:
+        """Encode through a sentence-transformers multi-process pool, one worker per device.
+
+        Only worthwhile for large inputs (the pool ships texts to worker processes); a no-op
+        returning False for other backends or fewer than two devices.
+        """
+        if self.backend != "sentence-transformers" or len(target_devices) < 2:
+            return False
+        self._ensure_model()
+        assert self._model is not None
+        self._pool = self._model.start_multi_process_pool(target_devices=target_devices)
+        return True
+
+    def stop_pool(self) -> None:
+        if self._pool is not None:
+            self._model.stop_multi_process_pool(self._pool)
+            self._pool = None
+
     def encode(self, texts: Iterable[str]) -> np.ndarray:
         texts = list(texts)
         if not texts:
             return np.zeros((0, 0), dtype=np.float32)
+        if self.cache_size <= 0 or self._pool is not None:
+            return self._encode(texts)
+
+        keys = [hashlib.blake2b(t.encode("utf-8"), digest_size=16).digest() for t in texts]
+        found: dict[bytes, np.ndarray] = {}
+        with self._cache_lock:
+            for key in keys:
+                vec = self._cache.get(key)
+                if vec is not None:
+                    self._cache.move_to_end(key)
+                    found[key] = vec
+        # Encode each distinct missing text once
+        missing = {key: text for key, text in zip(keys, texts, strict=True) if key not in found}
+        if missing:
+            vecs = self._encode(list(missing.values()))
+            with self._cache_lock:
+                for key, vec in zip(missing, vecs, strict=True):
+                    found[key] = vec
+                    self._cache[key] = vec.copy()  # don't pin the whole batch array
+                    self._cache.move_to_end(key)
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        # np.stack copies, so callers never hold references into the cache
+        return np.stack([found[key] for key in keys])
+
+    def _encode(self, texts: list[str]) -> np.ndarray:
         self._ensure_model()
         assert self._model is not None, "Model should be initialized after _ensure_model()"
         if self.backend == "sentence-transformers":
-            vecs = self._model.encode(texts, convert_to_numpy=True)
+            if self._pool is not None:
+                vecs = self._model.encode_multi_process(
+                    texts, self._pool, batch_size=self.batch_size
+                )
+            else:
+                vecs = self._model.encode(texts, batch_size=self.batch_size, convert_to_numpy=True)
             vecs = vecs.astype(np.float32)
             # L2-normalize to stabilize cosine similarity and drift metrics
             norms = np.linalg.norm(vecs, axis=1, keepdims=True)
             norms = np.where(norms == 0.0, 1.0, norms)
             return (vecs / norms).astype(np.float32)
+        elif self.backend == "onnx":
+            assert self._tokenizer is not None
+            chunks = []
+            for i in range(0, len(texts), self.batch_size):
+                enc = self._tokenizer(
+                    texts[i : i + self.batch_size],
+                    padding=True,
+                    truncation=True,
+                    max_length=256,  # all-MiniLM-L6-v2's max_seq_length under sentence-transformers
+                    return_tensors="np",
+                )
+                hidden = np.asarray(self._model(**enc).last_hidden_state, dtype=np.float32)
+                # Mean pooling over real tokens, as the sentence-transformers pooling layer does
+                mask = enc["attention_mask"][..., None].astype(np.float32)
+                chunks.append((hidden * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9))
+            vecs = np.vstack(chunks)
+            norms = np.linalg.norm(vecs, axis=1, keepdims=True)
+            norms = np.where(norms == 0.0, 1.0, norms)
+            return (vecs / norms).astype(np.float32)
         elif self.backend == "ollama":
             # Minimalistic batch wrapper; consider streaming or batching
             vectors: list[list[float]] = []
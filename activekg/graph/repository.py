@@ -6,6 +6,7 @@ import os
 import socket
 import sys
 import time
+import uuid
 from collections.abc import Sequence
 from contextlib import contextmanager
 from datetime import timezone
@@ -198,7 +199,13 @@ class GraphRepository:
     Uses psycopg_pool.ConnectionPool for efficient connection reuse.
     """
 
-    def __init__(self, dsn: str, candidate_factor: float = 2.0):
+    def __init__(
+        self,
+        dsn: str,
+        candidate_factor: float = 2.0,
+        pool_min_size: int = 2,
+        pool_max_size: int = 10,
+    ):
         self.dsn = dsn
         self.candidate_factor = candidate_factor  # For weighted search re-ranking
         self.logger = get_enhanced_logger(__name__)
@@ -207,16 +214,18 @@ class GraphRepository:
         # min_size=2: Keep 2 connections warm for low-latency requests
         # max_size=10: Allow up to 10 concurrent connections (adjust for load)
         # timeout=30: Wait up to 30s for available connection
+        # Single-threaded scripts can pass smaller sizes to avoid opening idle connections.
         self.pool = ConnectionPool(
             self.dsn,
-            min_size=2,
-            max_size=10,
+            min_size=pool_min_size,
+            max_size=pool_max_size,
             timeout=30.0,
             open=True,
             configure=self._configure_connection,
         )
         self.logger.info(
-            "Connection pool initialized", extra_fields={"min_size": 2, "max_size": 10}
+            "Connection pool initialized",
+            extra_fields={"min_size": pool_min_size, "max_size": pool_max_size},
         )
 
         # Detect and resolve RLS mode at startup
@@ -717,38 +726,66 @@ class GraphRepository:
                 return out
 
     # --- Nodes ---
+    _INSERT_NODE_SQL = """
+        INSERT INTO nodes (id, tenant_id, classes, props, payload_ref, embedding, metadata, refresh_policy, triggers, version, last_refreshed, drift_score, embedding_status, embedding_error, embedding_attempts, embedding_updated_at)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+        RETURNING id
+        """
+
+    @staticmethod
+    def _node_insert_params(node: Node) -> tuple[Any, ...]:
+        emb = node.embedding.tolist() if isinstance(node.embedding, np.ndarray) else None
+        return (
+            node.id,
+            node.tenant_id,
+            node.classes,
+            json.dumps(node.props),
+            node.payload_ref,
+            emb,
+            json.dumps(node.metadata),
+            json.dumps(node.refresh_policy),
+            json.dumps(node.triggers),
+            node.version,
+            node.last_refreshed,
+            node.drift_score,
+            node.embedding_status or "queued",
+            node.embedding_error,
+            node.embedding_attempts or 0,
+            node.embedding_updated_at,
+        )
+
     def create_node(self, node: Node) -> str:
         with self._conn(tenant_id=node.tenant_id) as conn:
             with conn.cursor() as cur:
-                emb = node.embedding.tolist() if isinstance(node.embedding, np.ndarray) else None
-                cur.execute(
-                    """
-                    INSERT INTO nodes (id, tenant_id, classes, props, payload_ref, embedding, metadata, refresh_policy, triggers, version, last_refreshed, drift_score, embedding_status, embedding_error, embedding_attempts, embedding_updated_at)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                    RETURNING id
-                    """,
-                    (
-                        node.id,
-                        node.tenant_id,
-                        node.classes,
-                        json.dumps(node.props),
-                        node.payload_ref,
-                        emb,
-                        json.dumps(node.metadata),
-                        json.dumps(node.refresh_policy),
-                        json.dumps(node.triggers),
-                        node.version,
-                        node.last_refreshed,
-                        node.drift_score,
-                        node.embedding_status or "queued",
-                        node.embedding_error,
-                        node.embedding_attempts or 0,
-                        node.embedding_updated_at,
-                    ),
-                )
+                cur.execute(self._INSERT_NODE_SQL, self._node_insert_params(node))
                 new_id = cur.fetchone()[0]
                 return str(new_id)
 
+    def create_nodes(self, nodes: Sequence[Node]) -> list[str]:
+        """Insert several nodes, one transaction and one pipelined executemany per tenant.
+
+        Same row shape as create_node, but the INSERTs for a tenant share a single round-trip
+        instead of one each. All-or-nothing per tenant. Returns ids in input order.
+        """
+        by_tenant: dict[str | None, list[int]] = {}
+        for i, node in enumerate(nodes):
+            by_tenant.setdefault(node.tenant_id, []).append(i)
+
+        ids: list[str] = [""] * len(nodes)
+        for tenant_id, positions in by_tenant.items():
+            with self._conn(tenant_id=tenant_id) as conn:
+                with conn.cursor() as cur:
+                    cur.executemany(
+                        self._INSERT_NODE_SQL,
+                        [self._node_insert_params(nodes[i]) for i in positions],
+                        returning=True,
+                    )
+                    # One result set per executed row, in parameter order
+                    for i in positions:
+                        ids[i] = str(cur.fetchone()[0])
+                        cur.nextset()
+        return ids
+
     def get_node(self, node_id: str, tenant_id: str | None = None) -> Node | None:
         with self._conn(tenant_id=tenant_id) as conn:
             with conn.cursor() as cur:
@@ -1094,49 +1131,36 @@ class GraphRepository:
                     ORDER BY embedding {op} %s
                     LIMIT %s
                 """
-                cur.execute(sql, params + [query_vec_param, fetch_limit])
+                params = params + [query_vec_param, fetch_limit]
 
-                results: list[tuple[Node, float]] = []
+                # Apply weighted scoring if enabled: re-rank the ANN candidates in Postgres.
+                # Age comes from epoch arithmetic on last_refreshed (no per-row timedelta
+                # objects in Python); nodes never refreshed count as 365 days old. The
+                # exponent is clamped at -700: Postgres raises on exp() underflow (below
+                # about -745) where Python's math.exp returned 0.0.
+                if use_weighted_score:
+                    sql = f"""
+                        SELECT c.*,
+                            c.similarity
+                            * exp(GREATEST(-700.0, -%s::float8 * COALESCE(
+                                EXTRACT(EPOCH FROM (now() - c.last_refreshed))::float8 / 86400.0,
+                                365.0)))
+                            * GREATEST(0.0, 1.0 - %s::float8 * COALESCE(c.drift_score, 0.0))
+                            AS weighted_score
+                        FROM ({sql}) c
+                        ORDER BY weighted_score DESC, c.similarity DESC
+                        LIMIT %s
+                    """
+                    params = [decay_lambda, drift_beta] + params + [top_k]
+                cur.execute(sql, params)
+
+                # Score column: similarity, or weighted_score appended after it
+                score_idx = 13 if use_weighted_score else 12
+                out: list[tuple[Node, float]] = []
                 for row in cur.fetchall():
                     row_t = cast(NodeVecSimRow, row)
                     node = self._build_node_from_row(cast(Sequence[Any], row_t))
-                    similarity = float(row_t[12])
-                    results.append((node, similarity))
-
-                # Apply weighted scoring if enabled
-                if use_weighted_score:
-                    import math
-                    from datetime import datetime
-
-                    weighted_results: list[tuple[Node, float]] = []
-                    now = datetime.now(timezone.utc)
-
-                    for node, similarity in results:
-                        # Calculate age in days
-                        if node.last_refreshed:
-                            age_seconds = (now - node.last_refreshed).total_seconds()
-                            age_days = age_seconds / 86400.0
-                        else:
-                            # No refresh timestamp - assume very old (e.g., 365 days)
-                            age_days = 365.0
-
-                        # Calculate decay: exp(-lambda * age_days)
-                        decay = math.exp(-decay_lambda * age_days)
-
-                        # Calculate drift penalty: 1 - (beta * drift_score)
-                        drift = node.drift_score if node.drift_score is not None else 0.0
-                        drift_penalty = max(0.0, 1.0 - (drift_beta * drift))
-
-                        # Weighted score
-                        weighted_score = similarity * decay * drift_penalty
-
-                        weighted_results.append((node, weighted_score))
-
-                    # Re-rank by weighted score and return top_k
-                    weighted_results.sort(key=lambda x: x[1], reverse=True)
-                    out = weighted_results[:top_k]
-                else:
-                    out = results
+                    out.append((node, float(row[score_idx])))
 
                 self.logger.info("vector_search results", extra_fields={"count": len(out)})
                 return out
@@ -1750,6 +1774,60 @@ class GraphRepository:
                     (edge.src, edge.rel, edge.dst, json.dumps(edge.props), edge.tenant_id),
                 )
 
+    def create_edges(self, edges: Sequence[Edge]) -> list[Edge]:
+        """Insert several edges, one transaction and one pipelined executemany per tenant.
+
+        Checked for every tenant before anything is written: each src/dst must be a node ID
+        (UUID) of an existing node with the edge's tenant_id, and no (src, rel, dst) may
+        repeat within the call; otherwise ValueError is raised and no edges are inserted.
+        Tenants still commit separately, so an INSERT failure (e.g. an edge that already
+        exists) for one tenant leaves earlier tenants' edges in place; pass a single
+        tenant's edges for an all-or-nothing call. Returns the inserted edges in input order.
+        """
+        by_tenant: dict[str | None, list[Edge]] = {}
+        seen: set[tuple[uuid.UUID, str, uuid.UUID]] = set()
+        for edge in edges:
+            try:
+                key = (uuid.UUID(edge.src), edge.rel, uuid.UUID(edge.dst))
+            except ValueError:
+                raise ValueError(
+                    f"Edge endpoints must be node IDs (UUIDs): {edge.src!r} -> {edge.dst!r}"
+                ) from None
+            if key in seen:
+                raise ValueError(f"Duplicate edge in batch: {edge.src} -{edge.rel}-> {edge.dst}")
+            seen.add(key)
+            by_tenant.setdefault(edge.tenant_id, []).append(edge)
+
+        for tenant_id, tenant_edges in by_tenant.items():
+            endpoint_ids = list(dict.fromkeys(i for e in tenant_edges for i in (e.src, e.dst)))
+            with self._conn(tenant_id=tenant_id) as conn:
+                with conn.cursor() as cur:
+                    cur.execute(
+                        """
+                        SELECT u.id FROM unnest(%s::uuid[]) AS u(id)
+                        WHERE NOT EXISTS (
+                            SELECT 1 FROM nodes n
+                            WHERE n.id = u.id AND n.tenant_id IS NOT DISTINCT FROM %s
+                        )
+                        """,
+                        (endpoint_ids, tenant_id),
+                    )
+                    missing = [str(row[0]) for row in cur.fetchall()]
+            if missing:
+                raise ValueError(f"Edge endpoint node(s) not found: {', '.join(missing)}")
+
+        for tenant_id, tenant_edges in by_tenant.items():
+            with self._conn(tenant_id=tenant_id) as conn:
+                with conn.cursor() as cur:
+                    cur.executemany(
+                        "INSERT INTO edges (src, rel, dst, props, tenant_id) VALUES (%s, %s, %s, %s, %s)",
+                        [
+                            (e.src, e.rel, e.dst, json.dumps(e.props), e.tenant_id)
+                            for e in tenant_edges
+                        ],
+                    )
+        return list(edges)
+
     # --- Events ---
     def append_event(
         self,
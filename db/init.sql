@@ -14,6 +14,8 @@ CREATE TABLE IF NOT EXISTS nodes (
   embedding_error TEXT,
   embedding_attempts INT NOT NULL DEFAULT 0,
   embedding_updated_at TIMESTAMPTZ,
+  text_sha256 BYTEA,
+  embedding_model TEXT,
   metadata JSONB NOT NULL DEFAULT '{}',
   refresh_policy JSONB NOT NULL DEFAULT '{}',
   triggers JSONB NOT NULL DEFAULT '[]',
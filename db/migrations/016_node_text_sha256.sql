@@ -0,0 +1,13 @@
+-- Migration 016: Track what produced each node embedding
+--
+-- examples/reembed_all.py records the SHA-256 of the text it encoded and the
+-- backend:model that encoded it, so a resumed run (--skip-unchanged, e.g. after a
+-- partial failure) can skip nodes whose text and model are unchanged instead of
+-- re-encoding them. Both stay NULL until the node is re-embedded by that script,
+-- and API writes do not update them.
+
+ALTER TABLE nodes
+ADD COLUMN IF NOT EXISTS text_sha256 BYTEA;
+
+ALTER TABLE nodes
+ADD COLUMN IF NOT EXISTS embedding_model TEXT;
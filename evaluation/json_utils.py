@@ -8,6 +8,11 @@ from typing import Any
 
 import numpy as np
 
+try:
+    import orjson
+except ImportError:  # optional: faster results serialization
+    orjson = None
+
 
 class NumpyEncoder(json.JSONEncoder):
     """JSON encoder that handles numpy types."""
@@ -16,33 +21,17 @@ class NumpyEncoder(json.JSONEncoder):
         # Handle numpy bool types (np.bool8 is deprecated, use np.bool_ only)
         if isinstance(obj, np.bool_):
             return bool(obj)
-        # Handle numpy integer types
-        if isinstance(
-            obj,
-            (
-                np.integer,
-                np.int_,
-                np.intc,
-                np.intp,
-                np.int8,
-                np.int16,
-                np.int32,
-                np.int64,
-                np.uint8,
-                np.uint16,
-                np.uint32,
-                np.uint64,
-            ),
-        ):
+        # Handle numpy integer types (np.integer covers every signed/unsigned width)
+        if isinstance(obj, np.integer):
             return int(obj)
-        # Handle numpy float types
-        if isinstance(obj, (np.floating, np.float_, np.float16, np.float32, np.float64)):
+        # Handle numpy float types (np.float_ was removed in NumPy 2; np.floating covers all)
+        if isinstance(obj, np.floating):
             return float(obj)
         # Handle numpy arrays
         if isinstance(obj, np.ndarray):
             return obj.tolist()
         # Handle numpy complex types
-        if isinstance(obj, (np.complexfloating, np.complex_, np.complex64, np.complex128)):
+        if isinstance(obj, np.complexfloating):
             return {"real": obj.real, "imag": obj.imag}
         return super().default(obj)
 
@@ -54,6 +43,24 @@ def safe_dump(obj: Any, file, **kwargs) -> None:
     json.dump(obj, file, **kwargs)
 
 
+def save_results(results: dict[str, Any], path: str) -> None:
+    """Write evaluation results JSON, using orjson when installed (handles numpy natively)."""
+    if orjson is not None:
+        with open(path, "wb") as f:
+            f.write(
+                orjson.dumps(
+                    results,
+                    option=orjson.OPT_INDENT_2
+                    | orjson.OPT_SERIALIZE_NUMPY
+                    | orjson.OPT_NON_STR_KEYS,
+                )
+            )
+        return
+
+    with open(path, "w") as f:
+        safe_dump(results, f)
+
+
 def safe_divide(numerator: float, denominator: float, default: float = 0.0) -> float:
     """Safely divide with default for zero denominator."""
     if denominator == 0:
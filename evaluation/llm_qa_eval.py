@@ -23,11 +23,13 @@ import argparse
 import json
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import Any
 
 import numpy as np
 import requests
+from json_utils import save_results
 
 
 def semantic_similarity(text1: str, text2: str) -> float:
@@ -55,8 +57,91 @@ def semantic_similarity(text1: str, text2: str) -> float:
     return intersection / union if union > 0 else 0.0
 
 
+def _pearson(x: np.ndarray, y: np.ndarray) -> float:
+    """Pearson correlation of two 1D arrays (NaN when either has zero variance)."""
+    dx = x - x.mean()
+    dy = y - y.mean()
+    denom = np.sqrt(np.dot(dx, dx) * np.dot(dy, dy))
+    return float(np.dot(dx, dy) / denom) if denom else float("nan")
+
+
+def _percentiles(values: np.ndarray, qs: tuple[float, ...]) -> list[float]:
+    """Linear-interpolated percentiles (same as np.percentile) from a single partition.
+
+    np.percentile sorts once per call; partitioning around only the ranks needed for
+    all requested percentiles avoids a full sort for each.
+    """
+    positions = np.asarray(qs, dtype=np.float64) / 100.0 * (values.size - 1)
+    lower = np.floor(positions).astype(np.intp)
+    upper = np.ceil(positions).astype(np.intp)
+    part = np.partition(values, np.unique(np.concatenate((lower, upper))))
+    frac = positions - lower
+    return [float(v) for v in part[lower] + (part[upper] - part[lower]) * frac]
+
+
+def _summary_stats(values: list[float]) -> dict[str, float | None]:
+    """Mean/median/std of values in one pass over a single array (None when empty)."""
+    if not values:
+        return {"mean": None, "median": None, "std": None}
+    arr = np.asarray(values, dtype=np.float64)
+    return {"mean": float(arr.mean()), "median": float(np.median(arr)), "std": float(arr.std())}
+
+
+def _fmt(value: float | None, spec: str = ".3f") -> str:
+    """Format an optional statistic for the report."""
+    return "N/A" if value is None else format(value, spec)
+
+
+def citation_precision_recall(
+    cited_sets: list[frozenset[str]], relevant_sets: list[frozenset[str]]
+) -> tuple[np.ndarray, np.ndarray]:
+    """Calculate citation precision/recall for a batch of answers in one pass.
+
+    Builds (Q, N) boolean indicator matrices over the union of node IDs so the
+    true-positive counts for every question come from a single vectorized AND.
+
+    Args:
+        cited_sets: Cited node IDs per answer
+        relevant_sets: Ground-truth relevant node IDs per answer
+
+    Returns:
+        (precision, recall) arrays of shape (Q,); NaN where either set is empty
+    """
+    node_to_col = {
+        nid: col for col, nid in enumerate(frozenset().union(*cited_sets, *relevant_sets))
+    }
+    cited = np.zeros((len(cited_sets), len(node_to_col)), dtype=bool)
+    relevant = np.zeros_like(cited)
+    for row, (cited_nodes, relevant_nodes) in enumerate(
+        zip(cited_sets, relevant_sets, strict=True)
+    ):
+        cited[row, [node_to_col[nid] for nid in cited_nodes]] = True
+        relevant[row, [node_to_col[nid] for nid in relevant_nodes]] = True
+
+    true_positives = (cited & relevant).sum(axis=1)
+    num_cited = cited.sum(axis=1)
+    num_relevant = relevant.sum(axis=1)
+    scored = (num_cited > 0) & (num_relevant > 0)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        precision = np.where(scored, true_positives / num_cited, np.nan)
+        recall = np.where(scored, true_positives / num_relevant, np.nan)
+    return precision, recall
+
+
+def _ask(api_url: str, question: str, timeout: int) -> tuple[requests.Response, float]:
+    """Call /ask once and return the response with its latency in seconds."""
+    start_time = time.perf_counter()
+    resp = requests.post(
+        f"{api_url}/ask",
+        json={"question": question, "max_results": 5, "use_weighted_score": True},
+        timeout=timeout,
+    )
+    return resp, time.perf_counter() - start_time
+
+
 def evaluate_llm_qa(
-    api_url: str, qa_dataset: list[dict[str, Any]], timeout: int = 30
+    api_url: str, qa_dataset: list[dict[str, Any]], timeout: int = 30, concurrency: int = 1
 ) -> dict[str, Any]:
     """Evaluate LLM Q&A endpoint.
 
@@ -64,6 +149,7 @@ def evaluate_llm_qa(
         api_url: Base API URL
         qa_dataset: List of QA items with question, answer, relevant_node_ids
         timeout: Request timeout in seconds
+        concurrency: Number of concurrent /ask requests (1 = sequential)
 
     Returns:
         Dict with evaluation metrics
@@ -76,25 +162,36 @@ def evaluate_llm_qa(
     print()
 
     results = []
-    latencies = []
+    cited_sets: list[frozenset[str]] = []
+    relevant_sets: list[frozenset[str]] = []
+    # Preallocated; `measured` masks out questions that never got a response
+    latencies = np.empty(len(qa_dataset), dtype=np.float64)
+    measured = np.zeros(len(qa_dataset), dtype=bool)
+
+    # Dispatch every /ask call up front. With concurrency, the longest questions go first
+    # (length is a cheap proxy for answer cost) so short ones backfill the tail of the batch;
+    # results are still consumed in dataset order below.
+    order = range(len(qa_dataset))
+    if concurrency > 1:
+        order = np.argsort([len(q["question"]) for q in qa_dataset], kind="stable")[::-1]
+    executor = ThreadPoolExecutor(max_workers=max(1, concurrency))
+    futures = {
+        int(i): executor.submit(_ask, api_url, qa_dataset[i]["question"], timeout) for i in order
+    }
+    executor.shutdown(wait=False)  # submitted calls keep running
 
     for idx, item in enumerate(qa_dataset, 1):
         question = item["question"]
         ground_truth_answer = item.get("answer", "")
-        relevant_nodes = set(item.get("relevant_node_ids", []))
+        relevant_nodes = frozenset(item.get("relevant_node_ids", []))
 
         print(f"[{idx}/{len(qa_dataset)}] {question[:60]}...")
 
         try:
-            # Call /ask endpoint
-            start_time = time.time()
-            resp = requests.post(
-                f"{api_url}/ask",
-                json={"question": question, "max_results": 5, "use_weighted_score": True},
-                timeout=timeout,
-            )
-            latency = time.time() - start_time
-            latencies.append(latency)
+            # Wait for this question's /ask call
+            resp, latency = futures[idx - 1].result()
+            latencies[idx - 1] = latency
+            measured[idx - 1] = True
 
             if resp.status_code != 200:
                 print(f"  ⚠ Error: HTTP {resp.status_code}")
@@ -110,25 +207,18 @@ def evaluate_llm_qa(
                 semantic_similarity(answer, ground_truth_answer) if ground_truth_answer else None
             )
 
-            # Extract cited node IDs
-            cited_nodes = {c["node_id"] for c in citations}
-
-            # Calculate citation precision and recall
-            if cited_nodes and relevant_nodes:
-                true_positives = len(cited_nodes & relevant_nodes)
-                precision = true_positives / len(cited_nodes) if cited_nodes else 0.0
-                recall = true_positives / len(relevant_nodes) if relevant_nodes else 0.0
-            else:
-                precision = None
-                recall = None
+            # Extract cited node IDs; precision/recall are scored for the whole batch below
+            cited_nodes = frozenset(c["node_id"] for c in citations)
+            cited_sets.append(cited_nodes)
+            relevant_sets.append(relevant_nodes)
 
             results.append(
                 {
                     "question": question,
                     "answer": answer[:100] + "..." if len(answer) > 100 else answer,
                     "accuracy": accuracy,
-                    "citation_precision": precision,
-                    "citation_recall": recall,
+                    "citation_precision": None,
+                    "citation_recall": None,
                     "confidence": confidence,
                     "latency": latency,
                     "num_citations": len(citations),
@@ -139,10 +229,8 @@ def evaluate_llm_qa(
 
             # Print summary
             acc_str = f"{accuracy:.2f}" if accuracy is not None else "N/A"
-            prec_str = f"{precision:.2f}" if precision is not None else "N/A"
-            rec_str = f"{recall:.2f}" if recall is not None else "N/A"
             print(
-                f"  ✓ Acc: {acc_str}, Prec: {prec_str}, Rec: {rec_str}, Conf: {confidence:.2f}, Lat: {latency:.2f}s"
+                f"  ✓ Acc: {acc_str}, Citations: {len(citations)}, Conf: {confidence:.2f}, Lat: {latency:.2f}s"
             )
 
         except requests.Timeout:
@@ -154,6 +242,24 @@ def evaluate_llm_qa(
 
     print()
 
+    # Citation precision/recall for all answered questions in one vectorized pass
+    if results:
+        precision_arr, recall_arr = citation_precision_recall(cited_sets, relevant_sets)
+        for result, precision, recall in zip(results, precision_arr, recall_arr, strict=True):
+            if not np.isnan(precision):
+                result["citation_precision"] = float(precision)
+                result["citation_recall"] = float(recall)
+
+        # Per-question citation diagnostics (scored after the loop, so printed here)
+        print("Citation precision/recall per answered question:")
+        for result in results:
+            prec = result["citation_precision"]
+            rec = result["citation_recall"]
+            prec_str = f"{prec:.2f}" if prec is not None else "N/A"
+            rec_str = f"{rec:.2f}" if rec is not None else "N/A"
+            print(f"  Prec: {prec_str}, Rec: {rec_str}  {result['question'][:60]}...")
+        print()
+
     # Aggregate metrics
     accuracies = [r["accuracy"] for r in results if r["accuracy"] is not None]
     precisions = [r["citation_precision"] for r in results if r["citation_precision"] is not None]
@@ -168,21 +274,26 @@ def evaluate_llm_qa(
             if results[i]["accuracy"] is not None
         ]
         if len(corr_pairs) > 3:
-            accs, confs = zip(*corr_pairs, strict=False)
-            confidence_calibration = np.corrcoef(accs, confs)[0, 1]
+            accs, confs = np.array(corr_pairs, dtype=np.float64).T
+            confidence_calibration = _pearson(accs, confs)
         else:
             confidence_calibration = None
     else:
         confidence_calibration = None
 
     # Calculate latency percentiles
-    if latencies:
-        p50 = np.percentile(latencies, 50)
-        p95 = np.percentile(latencies, 95)
-        p99 = np.percentile(latencies, 99)
+    latencies = latencies[measured]
+    if latencies.size:
+        p50, p95, p99 = _percentiles(latencies, (50, 95, 99))
     else:
         p50 = p95 = p99 = None
 
+    # Summary statistics, shared by the report and the returned summary
+    acc_stats = _summary_stats(accuracies)
+    precision_mean = _summary_stats(precisions)["mean"]
+    recall_mean = _summary_stats(recalls)["mean"]
+    confidence_mean = _summary_stats(confidences)["mean"]
+
     # Report results
     print("=" * 70)
     print("RESULTS SUMMARY")
@@ -190,21 +301,17 @@ def evaluate_llm_qa(
     print(f"Questions evaluated: {len(results)}")
     print()
     print("Answer Accuracy:")
-    print(f"  Mean:   {np.mean(accuracies):.3f}" if accuracies else "  Mean:   N/A")
-    print(f"  Median: {np.median(accuracies):.3f}" if accuracies else "  Median: N/A")
-    print(f"  Std:    {np.std(accuracies):.3f}" if accuracies else "  Std:    N/A")
+    print(f"  Mean:   {_fmt(acc_stats['mean'])}")
+    print(f"  Median: {_fmt(acc_stats['median'])}")
+    print(f"  Std:    {_fmt(acc_stats['std'])}")
     print()
     print("Citation Metrics:")
-    print(f"  Precision: {np.mean(precisions):.3f}" if precisions else "  Precision: N/A")
-    print(f"  Recall:    {np.mean(recalls):.3f}" if recalls else "  Recall:    N/A")
+    print(f"  Precision: {_fmt(precision_mean)}")
+    print(f"  Recall:    {_fmt(recall_mean)}")
     print()
     print("Confidence:")
-    print(f"  Mean:        {np.mean(confidences):.3f}" if confidences else "  Mean:        N/A")
-    print(
-        f"  Calibration: {confidence_calibration:.3f}"
-        if confidence_calibration is not None
-        else "  Calibration: N/A"
-    )
+    print(f"  Mean:        {_fmt(confidence_mean)}")
+    print(f"  Calibration: {_fmt(confidence_calibration)}")
     print()
     print("Latency:")
     print(f"  p50: {p50:.2f}s" if p50 else "  p50: N/A")
@@ -213,9 +320,9 @@ def evaluate_llm_qa(
     print()
 
     # Check against expected results
-    avg_accuracy = np.mean(accuracies) if accuracies else 0.0
-    avg_precision = np.mean(precisions) if precisions else 0.0
-    avg_recall = np.mean(recalls) if recalls else 0.0
+    avg_accuracy = acc_stats["mean"] or 0.0
+    avg_precision = precision_mean or 0.0
+    avg_recall = recall_mean or 0.0
 
     accuracy_good = avg_accuracy >= 0.75
     precision_good = avg_precision >= 0.80
@@ -245,23 +352,17 @@ def evaluate_llm_qa(
         "results": results,
         "summary": {
             "num_questions": len(results),
-            "accuracy": {
-                "mean": float(np.mean(accuracies)) if accuracies else None,
-                "median": float(np.median(accuracies)) if accuracies else None,
-                "std": float(np.std(accuracies)) if accuracies else None,
-            },
-            "citation_precision": {"mean": float(np.mean(precisions)) if precisions else None},
-            "citation_recall": {"mean": float(np.mean(recalls)) if recalls else None},
+            "accuracy": acc_stats,
+            "citation_precision": {"mean": precision_mean},
+            "citation_recall": {"mean": recall_mean},
             "confidence": {
-                "mean": float(np.mean(confidences)) if confidences else None,
-                "calibration": float(confidence_calibration)
-                if confidence_calibration is not None
-                else None,
+                "mean": confidence_mean,
+                "calibration": confidence_calibration,
             },
             "latency": {
-                "p50": float(p50) if p50 else None,
-                "p95": float(p95) if p95 else None,
-                "p99": float(p99) if p99 else None,
+                "p50": p50,
+                "p95": p95,
+                "p99": p99,
             },
         },
         "meets_expectations": {
@@ -306,6 +407,9 @@ def main():
         help="Q&A dataset (JSON or JSONL)",
     )
     parser.add_argument("--timeout", type=int, default=30, help="Request timeout in seconds")
+    parser.add_argument(
+        "--concurrency", type=int, default=1, help="Concurrent /ask requests (1 = sequential)"
+    )
     parser.add_argument(
         "--output", default="evaluation/llm_qa_results.json", help="Output JSON file"
     )
@@ -322,7 +426,9 @@ def main():
         print(f"Loaded {len(qa_dataset)} Q&A items from {args.dataset}\n")
 
         # Run evaluation
-        results = evaluate_llm_qa(args.api_url, qa_dataset, timeout=args.timeout)
+        results = evaluate_llm_qa(
+            args.api_url, qa_dataset, timeout=args.timeout, concurrency=args.concurrency
+        )
 
         # Save results
         results["timestamp"] = datetime.now().isoformat()
@@ -330,10 +436,10 @@ def main():
             "api_url": args.api_url,
             "dataset": args.dataset,
             "timeout": args.timeout,
+            "concurrency": args.concurrency,
         }
 
-        with open(args.output, "w") as f:
-            json.dump(results, f, indent=2)
+        save_results(results, args.output)
 
         print(f"\n✓ Results saved to {args.output}")
 
@@ -22,23 +22,114 @@ import argparse
 import json
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import Any
 
 import numpy as np
 import requests
+from json_utils import save_results
+from requests.adapters import HTTPAdapter
+
+try:
+    from numba import njit, prange
+except ImportError:  # optional: JIT-compile the ranking-metrics kernel
+    njit = None
+    prange = range
+
+
+_NDCG_K = 10
+
+# 1/log2(rank + 1) for 1-based ranks, shared by every NDCG computation
+_LOG2_DISCOUNT = 1.0 / np.log2(np.arange(2, 1024, dtype=np.float64))
+
+
+def _rank_metrics_numpy(
+    rel: np.ndarray, num_relevant: np.ndarray, k_values: np.ndarray, discount: np.ndarray
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Vectorized recall@k, reciprocal rank, and NDCG@10 for all queries at once.
+
+    Args:
+        rel: (Q, W) bool relevance mask per rank position, False-padded
+        num_relevant: (Q,) number of ground-truth relevant IDs per query
+        k_values: (K,) cutoffs for recall@k
+        discount: (>= _NDCG_K,) 1/log2(rank+1) per rank position
+
+    Returns:
+        (recall (Q, K), reciprocal_rank (Q,), ndcg (Q,))
+    """
+    width = rel.shape[1]
+    hits_at = np.zeros((rel.shape[0], width + 1))
+    np.cumsum(rel, axis=1, out=hits_at[:, 1:])
+    recall = hits_at[:, np.minimum(k_values, width)] / num_relevant[:, None]
+
+    first_hit = rel.argmax(axis=1)
+    reciprocal_rank = np.where(rel.any(axis=1), 1.0 / (first_hit + 1), 0.0)
+
+    cutoff = min(_NDCG_K, width)
+    dcg = rel[:, :cutoff] @ discount[:cutoff]
+    ideal_cumsum = np.cumsum(discount[:_NDCG_K])
+    idcg = ideal_cumsum[np.minimum(num_relevant, _NDCG_K) - 1]
+    ndcg = dcg / idcg
+    return recall, reciprocal_rank, ndcg
+
+
+def _rank_metrics_kernel(
+    rel: np.ndarray, num_relevant: np.ndarray, k_values: np.ndarray, discount: np.ndarray
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Loop form of _rank_metrics_numpy, compiled with Numba when it is installed."""
+    num_queries, width = rel.shape
+    recall = np.zeros((num_queries, k_values.size))
+    reciprocal_rank = np.zeros(num_queries)
+    ndcg = np.zeros(num_queries)
+
+    for q in prange(num_queries):
+        hits = 0
+        dcg = 0.0
+        for pos in range(width):
+            if rel[q, pos]:
+                hits += 1
+                if hits == 1:
+                    reciprocal_rank[q] = 1.0 / (pos + 1)
+                if pos < _NDCG_K:
+                    dcg += discount[pos]
+            for j in range(k_values.size):
+                if pos + 1 == k_values[j]:
+                    recall[q, j] = hits / num_relevant[q]
+        for j in range(k_values.size):
+            if k_values[j] > width:
+                recall[q, j] = hits / num_relevant[q]
+
+        idcg = 0.0
+        for pos in range(min(_NDCG_K, num_relevant[q])):
+            idcg += discount[pos]
+        ndcg[q] = dcg / idcg
+
+    return recall, reciprocal_rank, ndcg
+
+
+if njit is not None:
+    _rank_metrics = njit(cache=True, parallel=True)(_rank_metrics_kernel)
+else:
+    _rank_metrics = _rank_metrics_numpy
+
+
+def _nanmean_or_zero(values: list[float | None]) -> float:
+    """Mean of the non-None values (0.0 when there are none), as one NumPy reduction."""
+    arr = np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+    return float(np.nanmean(arr)) if np.isfinite(arr).any() else 0.0
 
 
 def calculate_metrics(
     results_list: list[dict[str, Any]],
-    ground_truth: dict[str, list[str]],
+    ground_truth: dict[str, frozenset[str]],
     k_values: list[int] = None,
 ) -> dict[str, Any]:
     """Calculate retrieval metrics.
 
     Args:
         results_list: List of search results for each query
-        ground_truth: Dict mapping query -> relevant node IDs
+        ground_truth: Dict mapping query -> frozenset of relevant node IDs
         k_values: List of k values for recall@k
 
     Returns:
@@ -46,16 +137,15 @@ def calculate_metrics(
     """
     if k_values is None:
         k_values = [1, 5, 10, 20]
-    recall_at_k = {k: [] for k in k_values}
-    reciprocal_ranks = []
-    ndcg_scores = []
+    rel_masks = []
+    num_relevant = []
     avg_ages = []
     avg_drifts = []
 
     for result in results_list:
         query = result["query"]
         retrieved = result["results"]
-        relevant_ids = set(ground_truth.get(query, []))
+        relevant_ids = ground_truth.get(query) or frozenset()
 
         if not relevant_ids:
             continue  # Skip queries without ground truth
@@ -67,53 +157,42 @@ def calculate_metrics(
         retrieved_ages = [None for _ in retrieved]
         retrieved_drifts = [None for _ in retrieved]
 
-        # Calculate recall@k for each k
-        for k in k_values:
-            retrieved_k = set(retrieved_ids[:k])
-            recall = len(retrieved_k & relevant_ids) / len(relevant_ids)
-            recall_at_k[k].append(recall)
-
-        # Calculate reciprocal rank
-        rr = 0.0
-        for idx, node_id in enumerate(retrieved_ids, start=1):
-            if node_id in relevant_ids:
-                rr = 1.0 / idx
-                break
-        reciprocal_ranks.append(rr)
-
-        # Calculate NDCG@10
-        dcg = 0.0
-        idcg = 0.0
-        for idx in range(min(10, len(retrieved_ids))):
-            rel = 1.0 if retrieved_ids[idx] in relevant_ids else 0.0
-            dcg += rel / np.log2(idx + 2)  # +2 because idx starts at 0
-
-        # Ideal DCG (all relevant at top)
-        num_relevant = len(relevant_ids)
-        for idx in range(min(10, num_relevant)):
-            idcg += 1.0 / np.log2(idx + 2)
-
-        ndcg = dcg / idcg if idcg > 0 else 0.0
-        ndcg_scores.append(ndcg)
+        # Relevance indicator per rank position (/search returns each node at most once)
+        rel_masks.append(
+            np.fromiter(
+                (node_id in relevant_ids for node_id in retrieved_ids),
+                dtype=bool,
+                count=len(retrieved_ids),
+            )
+        )
+        num_relevant.append(len(relevant_ids))
 
         # Calculate average age and drift of top-10
-        top_10_ages = retrieved_ages[:10]
-        top_10_drifts = retrieved_drifts[:10]
-        ages_nonnull = [a for a in top_10_ages if a is not None]
-        drifts_nonnull = [d for d in top_10_drifts if d is not None]
-        avg_ages.append(np.mean(ages_nonnull) if ages_nonnull else 0.0)
-        avg_drifts.append(np.mean(drifts_nonnull) if drifts_nonnull else 0.0)
+        avg_ages.append(_nanmean_or_zero(retrieved_ages[:10]))
+        avg_drifts.append(_nanmean_or_zero(retrieved_drifts[:10]))
+
+    # Recall@k, reciprocal rank, and NDCG@10 for every query in one kernel call
+    if rel_masks:
+        width = max(1, max(mask.size for mask in rel_masks))
+        rel = np.zeros((len(rel_masks), width), dtype=bool)
+        for row, mask in enumerate(rel_masks):
+            rel[row, : mask.size] = mask
+        recall, reciprocal_ranks, ndcg_scores = _rank_metrics(
+            rel, np.asarray(num_relevant, dtype=np.int64), np.asarray(k_values), _LOG2_DISCOUNT
+        )
+        recall_at_k = {k: recall[:, j].mean() for j, k in enumerate(k_values)}
+    else:
+        reciprocal_ranks = ndcg_scores = np.empty(0)
+        recall_at_k = dict.fromkeys(k_values, 0.0)
 
     # Aggregate metrics
     metrics = {
-        "recall": {
-            f"recall@{k}": np.mean(recall_at_k[k]) if recall_at_k[k] else 0.0 for k in k_values
-        },
-        "mrr": np.mean(reciprocal_ranks) if reciprocal_ranks else 0.0,
-        "ndcg@10": np.mean(ndcg_scores) if ndcg_scores else 0.0,
+        "recall": {f"recall@{k}": recall_at_k[k] for k in k_values},
+        "mrr": reciprocal_ranks.mean() if reciprocal_ranks.size else 0.0,
+        "ndcg@10": ndcg_scores.mean() if ndcg_scores.size else 0.0,
         "avg_age_days": np.mean(avg_ages) if avg_ages else 0.0,
         "avg_drift_score": np.mean(avg_drifts) if avg_drifts else 0.0,
-        "num_queries": len(reciprocal_ranks),
+        "num_queries": len(rel_masks),
     }
 
     return metrics
@@ -153,8 +232,77 @@ def run_search_queries(
     return results_list
 
 
+def _search(
+    session: requests.Session, api_url: str, query: str, top_k: int, use_weighted: bool
+) -> tuple[list[dict[str, Any]], float]:
+    """Run one /search call and return its results with its perf_counter() finish time."""
+    resp = session.post(
+        f"{api_url}/search",
+        json={"query": query, "top_k": top_k, "use_weighted_score": use_weighted},
+        timeout=10,
+    )
+    resp.raise_for_status()
+    return resp.json().get("results", []), time.perf_counter()
+
+
+def run_search_queries_interleaved(
+    api_url: str, queries: list[str], top_k: int = 20, concurrency: int = 4
+) -> tuple[list[dict[str, Any]], list[dict[str, Any]], float, float]:
+    """Run baseline and weighted searches for every query side by side.
+
+    Both modes for a query are submitted back to back to one thread pool sharing a
+    pooled session, so they reuse warm keep-alive connections instead of running as
+    two separate sequential passes.
+
+    Args:
+        api_url: Base API URL
+        queries: List of search queries
+        top_k: Number of results to retrieve
+        concurrency: Number of concurrent workers
+
+    Returns:
+        (baseline_results, weighted_results, baseline_time, weighted_time); times are
+        wall-clock seconds from the start of the pass until each mode's last request
+        finished, comparable to the sequential path's per-pass times
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(1, concurrency))
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+
+    results_by_mode: dict[bool, list[dict[str, Any]]] = {False: [], True: []}
+    time_by_mode = {False: 0.0, True: 0.0}
+
+    with session, ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+        pass_start = time.perf_counter()
+        futures = [
+            (
+                query,
+                use_weighted,
+                executor.submit(_search, session, api_url, query, top_k, use_weighted),
+            )
+            for query in queries
+            for use_weighted in (False, True)
+        ]
+        for query, use_weighted, future in futures:
+            try:
+                results, finished_at = future.result()
+            except Exception as e:
+                print(f"⚠ Query failed: {query[:50]}... ({e})")
+                continue
+            results_by_mode[use_weighted].append({"query": query, "results": results})
+            time_by_mode[use_weighted] = max(time_by_mode[use_weighted], finished_at - pass_start)
+
+    return results_by_mode[False], results_by_mode[True], time_by_mode[False], time_by_mode[True]
+
+
 def compare_weighted_vs_baseline(
-    api_url: str, test_queries: list[str], ground_truth: dict[str, list[str]], top_k: int = 20
+    api_url: str,
+    test_queries: list[str],
+    ground_truth: dict[str, list[str]],
+    top_k: int = 20,
+    dual_mode: bool = False,
+    concurrency: int = 4,
 ) -> dict[str, Any]:
     """Compare weighted vs baseline search quality.
 
@@ -163,6 +311,8 @@ def compare_weighted_vs_baseline(
         test_queries: List of test queries
         ground_truth: Dict mapping query -> relevant node IDs
         top_k: Number of results to retrieve
+        dual_mode: Run baseline and weighted searches interleaved in one pass
+        concurrency: Number of concurrent workers for dual mode
 
     Returns:
         Dict with baseline, weighted, and delta metrics
@@ -175,11 +325,26 @@ def compare_weighted_vs_baseline(
     print(f"Top-k: {top_k}")
     print()
 
+    # Freeze ground truth once so both runs share the same relevance sets
+    ground_truth = {query: frozenset(ids) for query, ids in ground_truth.items()}
+
+    if dual_mode:
+        print("Running baseline and weighted queries interleaved (--dual-mode)...")
+        baseline_results, weighted_results, baseline_time, weighted_time = (
+            run_search_queries_interleaved(
+                api_url, test_queries, top_k=top_k, concurrency=concurrency
+            )
+        )
+        print()
+
     # 1. Run baseline queries (use_weighted_score=False)
-    print("Step 1: Running baseline queries (use_weighted_score=False)...")
-    baseline_start = time.time()
-    baseline_results = run_search_queries(api_url, test_queries, top_k=top_k, use_weighted=False)
-    baseline_time = time.time() - baseline_start
+    if not dual_mode:
+        print("Step 1: Running baseline queries (use_weighted_score=False)...")
+        baseline_start = time.perf_counter()
+        baseline_results = run_search_queries(
+            api_url, test_queries, top_k=top_k, use_weighted=False
+        )
+        baseline_time = time.perf_counter() - baseline_start
 
     baseline_metrics = calculate_metrics(baseline_results, ground_truth)
     print(f"✓ Baseline Recall@10: {baseline_metrics['recall']['recall@10']:.3f}")
@@ -189,10 +354,11 @@ def compare_weighted_vs_baseline(
     print(f"✓ Time: {baseline_time:.2f}s\n")
 
     # 2. Run weighted queries (use_weighted_score=True)
-    print("Step 2: Running weighted queries (use_weighted_score=True)...")
-    weighted_start = time.time()
-    weighted_results = run_search_queries(api_url, test_queries, top_k=top_k, use_weighted=True)
-    weighted_time = time.time() - weighted_start
+    if not dual_mode:
+        print("Step 2: Running weighted queries (use_weighted_score=True)...")
+        weighted_start = time.perf_counter()
+        weighted_results = run_search_queries(api_url, test_queries, top_k=top_k, use_weighted=True)
+        weighted_time = time.perf_counter() - weighted_start
 
     weighted_metrics = calculate_metrics(weighted_results, ground_truth)
     print(f"✓ Weighted Recall@10: {weighted_metrics['recall']['recall@10']:.3f}")
@@ -317,6 +483,14 @@ def main():
         help="Ground truth JSON file",
     )
     parser.add_argument("--top-k", type=int, default=20, help="Number of results to retrieve")
+    parser.add_argument(
+        "--dual-mode",
+        action="store_true",
+        help="Run baseline and weighted searches interleaved on one pooled session",
+    )
+    parser.add_argument(
+        "--concurrency", type=int, default=4, help="Concurrent workers for --dual-mode"
+    )
     parser.add_argument(
         "--output", default="evaluation/weighted_search_results.json", help="Output JSON file"
     )
@@ -328,7 +502,12 @@ def main():
 
         # Run evaluation
         results = compare_weighted_vs_baseline(
-            args.api_url, queries, ground_truth, top_k=args.top_k
+            args.api_url,
+            queries,
+            ground_truth,
+            top_k=args.top_k,
+            dual_mode=args.dual_mode,
+            concurrency=args.concurrency,
         )
 
         # Save results
@@ -337,10 +516,10 @@ def main():
             "api_url": args.api_url,
             "top_k": args.top_k,
             "num_queries": len(queries),
+            "dual_mode": args.dual_mode,
         }
 
-        with open(args.output, "w") as f:
-            json.dump(results, f, indent=2)
+        save_results(results, args.output)
 
         print(f"\n✓ Results saved to {args.output}")
 
@@ -10,8 +10,13 @@ It will:
 4. Recompute drift scores and log to embedding_history table
 """
 
+import hashlib
+import json
 import os
+import queue
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 import numpy as np
 import psycopg
@@ -24,24 +29,184 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from activekg.common.logger import get_enhanced_logger
 from activekg.engine.embedding_provider import EmbeddingProvider
 
+try:
+    from orjson import loads as _json_loads
+except ImportError:  # optional: faster parsing of text-encoded embeddings
+    _json_loads = json.loads
+
 logger = get_enhanced_logger(__name__)
 
 
+def _to_vec(embedding) -> np.ndarray:
+    """Return a stored embedding as a float32 vector.
+
+    With register_vector() pgvector already yields ndarrays; the JSON-text branch only
+    covers connections where the vector type is not registered.
+    """
+    if isinstance(embedding, str):
+        embedding = _json_loads(embedding)
+    return np.asarray(embedding, dtype=np.float32)
+
+
+# Pipeline plumbing: bounded queues between the DB reader, the encoder and the DB writer
+_QUEUE_DEPTH = 2
+_DONE = object()
+
+# Rows fetched per length-sorting window (smart batching; see _read_batches)
+_SORT_WINDOW = 1024
+
+
+def _put(q: queue.Queue, item, stop: threading.Event) -> bool:
+    """Put onto a bounded queue, giving up if another pipeline stage has failed."""
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=0.5)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _get(q: queue.Queue, stop: threading.Event):
+    """Get from a queue, returning _DONE if another pipeline stage has failed."""
+    while not stop.is_set():
+        try:
+            return q.get(timeout=0.5)
+        except queue.Empty:
+            continue
+    return _DONE
+
+
+def _has_hash_columns(dsn: str) -> bool:
+    """True if nodes has the text_sha256/embedding_model columns (migration 016)."""
+    with psycopg.connect(dsn) as conn:
+        row = conn.execute(
+            """
+            SELECT count(*) FROM information_schema.columns
+            WHERE table_name = 'nodes' AND column_name IN ('text_sha256', 'embedding_model')
+            """
+        ).fetchone()
+    return row is not None and row[0] == 2
+
+
+def _read_batches(
+    dsn: str, batch_size: int, out_q: queue.Queue, stop: threading.Event, track: bool
+) -> None:
+    """Reader stage: stream nodes with text content in batches from a server-side cursor.
+
+    Rows are fetched in windows of _SORT_WINDOW and sorted by text length before being cut
+    into batches, so each encode call sees similarly sized texts and pads far less. Each
+    node is updated independently by id, so the reordering needs no un-permuting. Without
+    `track` (no migration 016), the hash/model columns are read as NULL.
+    """
+    recorded = (
+        "text_sha256, embedding_model"
+        if track
+        else "NULL::bytea AS text_sha256, NULL::text AS embedding_model"
+    )
+    try:
+        with psycopg.connect(dsn, autocommit=False, row_factory=dict_row) as conn:
+            register_vector(conn)
+            with conn.cursor(name="reembed_stream") as cur:
+                window = max(batch_size, _SORT_WINDOW)
+                cur.itersize = window
+                cur.execute(f"""
+                    SELECT id, props->>'text' as text, embedding, {recorded}
+                    FROM nodes
+                    WHERE props->>'text' IS NOT NULL
+                    ORDER BY created_at
+                """)
+                while rows := cur.fetchmany(window):
+                    rows.sort(key=lambda row: len(row["text"]))
+                    for i in range(0, len(rows), batch_size):
+                        if not _put(out_q, rows[i : i + batch_size], stop):
+                            return
+    except BaseException:
+        stop.set()
+        raise
+    finally:
+        _put(out_q, _DONE, stop)
+
+
+def _write_batches(dsn: str, in_q: queue.Queue, stop: threading.Event, track: bool) -> None:
+    """Writer stage: apply each batch's UPDATEs and history INSERTs, one commit per batch.
+
+    Update rows carry the text hash and model id only when `track` is set.
+    """
+    recorded = "text_sha256 = %s, embedding_model = %s," if track else ""
+    try:
+        with psycopg.connect(dsn, autocommit=False) as conn:
+            register_vector(conn)
+            with conn.cursor() as cur:
+                while (item := _get(in_q, stop)) is not _DONE:
+                    batch_num, update_rows, history_rows = item
+                    # Send the whole batch in one pipelined round-trip instead of one per node.
+                    # Embeddings go as float32 ndarrays over pgvector's binary dumper (%b),
+                    # skipping per-element Python floats and server-side text parsing.
+                    with conn.pipeline():
+                        cur.executemany(
+                            f"""
+                            UPDATE nodes
+                            SET embedding = %b,
+                                drift_score = %s,
+                                {recorded}
+                                updated_at = NOW()
+                            WHERE id = %s
+                        """,
+                            update_rows,
+                        )
+                        if history_rows:
+                            # One multi-row INSERT for the batch's significant-drift nodes
+                            node_ids, drifts = zip(*history_rows, strict=True)
+                            cur.execute(
+                                """
+                                INSERT INTO embedding_history (node_id, drift_score, embedding_ref)
+                                SELECT node_id, drift_score, 'reembed_normalization'
+                                FROM unnest(%s::uuid[], %s::float8[]) AS h(node_id, drift_score)
+                            """,
+                                (list(node_ids), list(drifts)),
+                            )
+                    conn.commit()
+                    logger.info(f"Committed batch {batch_num}")
+    except BaseException:
+        stop.set()
+        raise
+
+
 def reembed_all_nodes(
     dsn: str,
     backend: str = "sentence-transformers",
     model_name: str | None = None,
     batch_size: int = 32,
     dry_run: bool = False,
+    device: str = "cpu",
+    encode_batch_size: int | None = None,
+    devices: list[str] | None = None,
+    skip_unchanged: bool = False,
+    min_drift: float = 1e-6,
 ) -> int:
     """Re-embed all nodes in the database.
 
+    Runs as a three-stage pipeline so DB reads and writes overlap with encoding: a reader
+    thread streams batches, this thread encodes them and computes drift, and a writer
+    thread (on its own connection) applies the updates.
+
     Args:
         dsn: PostgreSQL connection string
-        backend: Embedding backend ('sentence-transformers' or 'ollama')
+        backend: Embedding backend ('sentence-transformers', 'onnx' or 'ollama')
         model_name: Model name (defaults to all-MiniLM-L6-v2 for sentence-transformers)
-        batch_size: Number of nodes to process at once
+        batch_size: Number of nodes read, encoded and written per DB batch
         dry_run: If True, don't update database
+        device: Encoding device for sentence-transformers ('cpu', 'cuda', or 'auto')
+        encode_batch_size: Model forward-pass batch size (default: 64 on CUDA, 32 on CPU)
+        devices: Shard encoding across these devices (e.g. ['cuda:0', 'cuda:1']) through a
+            multi-process pool; ignored with fewer than two. Pair with a large batch_size.
+        skip_unchanged: Don't re-encode nodes whose text and model match what this script
+            recorded the last time it embedded them. For resuming an interrupted run only:
+            the model id doesn't capture normalization changes, and API writes don't update
+            the recorded columns. Requires migration 016 (ValueError without it).
+        min_drift: Skip the UPDATE for nodes whose drift is at or below this and whose text
+            hash and model are already recorded, since the write would change nothing
 
     Returns:
         Number of nodes re-embedded
@@ -50,115 +215,144 @@ def reembed_all_nodes(
         f"Starting re-embed process (backend={backend}, model={model_name}, dry_run={dry_run})"
     )
 
-    # Initialize embedding provider
-    embedder = EmbeddingProvider(backend=backend, model_name=model_name)
-
-    # Connect to database
-    conn = psycopg.connect(dsn, autocommit=False, row_factory=dict_row)
-    register_vector(conn)
-    cur = conn.cursor()
-
-    try:
-        # Fetch all nodes with text content
-        cur.execute("""
-            SELECT id, props->>'text' as text, embedding
-            FROM nodes
-            WHERE props->>'text' IS NOT NULL
-            ORDER BY created_at
-        """)
-        nodes = cur.fetchall()
-
-        if not nodes:
-            logger.warning("No nodes found with text content")
-            return 0
-
-        logger.info(f"Found {len(nodes)} nodes to re-embed")
+    # Text hashes and model ids are only read and written once migration 016 is applied
+    track = _has_hash_columns(dsn)
+    if not track:
+        if skip_unchanged:
+            raise ValueError(
+                "skip_unchanged needs nodes.text_sha256/embedding_model: "
+                "apply db/migrations/016_node_text_sha256.sql first"
+            )
+        logger.info("Migration 016 not applied; text hashes and model ids won't be recorded")
 
-        # Process in batches
-        updated_count = 0
-        for i in range(0, len(nodes), batch_size):
-            batch = nodes[i : i + batch_size]
-            node_ids = [n["id"] for n in batch]
-            texts = [n["text"] for n in batch]
-            old_embeddings = [n["embedding"] for n in batch]
+    # Initialize embedding provider
+    embedder = EmbeddingProvider(
+        backend=backend, model_name=model_name, device=device, batch_size=encode_batch_size
+    )
 
-            logger.info(
-                f"Processing batch {i // batch_size + 1}/{(len(nodes) - 1) // batch_size + 1} ({len(batch)} nodes)"
+    if devices and embedder.start_pool(devices):
+        logger.info(f"Encoding with a multi-process pool on {', '.join(devices)}")
+        if batch_size < embedder.batch_size * len(devices):
+            logger.warning(
+                f"batch_size={batch_size} leaves pool workers idle; "
+                f"use at least {embedder.batch_size * len(devices)}"
             )
 
-            # Generate new normalized embeddings
-            new_embeddings = embedder.encode(texts)
-
-            # Update each node
-            for node_id, old_emb, new_emb in zip(
-                node_ids, old_embeddings, new_embeddings, strict=False
-            ):
-                # Calculate drift if old embedding exists
-                drift_score = None
-                if old_emb is not None:
-                    # Handle both JSON string and list representations
-                    if isinstance(old_emb, str):
-                        import json
-
-                        old_emb = json.loads(old_emb)
-                    old_vec = np.array(old_emb, dtype=np.float32)
-                    # Normalize old vector for fair comparison
-                    old_norm = np.linalg.norm(old_vec)
-                    if old_norm > 0:
-                        old_vec = old_vec / old_norm
-
-                    # Cosine similarity between old (normalized) and new (already normalized)
-                    similarity = float(np.dot(old_vec, new_emb))
-                    drift_score = 1.0 - similarity
-
-                if not dry_run:
-                    # Update embedding
-                    cur.execute(
-                        """
-                        UPDATE nodes
-                        SET embedding = %s,
-                            drift_score = %s,
-                            updated_at = NOW()
-                        WHERE id = %s
-                    """,
-                        (new_emb.tolist(), drift_score or 0.0, node_id),
-                    )
-
-                    # Log to embedding_history table if drift is significant
-                    if drift_score is not None and drift_score > 0.01:
-                        cur.execute(
-                            """
-                            INSERT INTO embedding_history (node_id, drift_score, embedding_ref)
-                            VALUES (%s, %s, %s)
-                        """,
-                            (node_id, drift_score, "reembed_normalization"),
-                        )
+    # Identifies what produced an embedding; with the text hash it lets resumed runs skip nodes
+    model_id = f"{backend}:{embedder.model_name}"
 
-                updated_count += 1
+    read_q: queue.Queue = queue.Queue(maxsize=_QUEUE_DEPTH)
+    write_q: queue.Queue = queue.Queue(maxsize=_QUEUE_DEPTH)
+    stop = threading.Event()
 
-                # Log drift for monitoring
-                if drift_score is not None:
-                    if drift_score > 0.1:
-                        logger.warning(
-                            f"Node {node_id[:8]}... has significant drift: {drift_score:.4f}"
+    updated_count = 0
+    skipped_count = 0
+    unchanged_count = 0
+    batch_num = 0
+    try:
+        with ThreadPoolExecutor(max_workers=2, thread_name_prefix="reembed") as pool:
+            reader = pool.submit(_read_batches, dsn, batch_size, read_q, stop, track)
+            writer = None if dry_run else pool.submit(_write_batches, dsn, write_q, stop, track)
+            try:
+                while (batch := _get(read_q, stop)) is not _DONE:
+                    batch_num += 1
+                    hashes = [hashlib.sha256(n["text"].encode("utf-8")).digest() for n in batch]
+                    if skip_unchanged:
+                        todo = [
+                            i
+                            for i, n in enumerate(batch)
+                            if n["embedding_model"] != model_id or n["text_sha256"] != hashes[i]
+                        ]
+                        if len(todo) < len(batch):
+                            skipped_count += len(batch) - len(todo)
+                            batch = [batch[i] for i in todo]
+                            hashes = [hashes[i] for i in todo]
+                        if not batch:
+                            continue
+                    node_ids = [n["id"] for n in batch]
+                    texts = [n["text"] for n in batch]
+                    old_embeddings = [n["embedding"] for n in batch]
+
+                    logger.info(f"Processing batch {batch_num} ({len(batch)} nodes)")
+
+                    # Generate new normalized embeddings
+                    new_embeddings = embedder.encode(texts)
+
+                    # Drift = 1 - cosine(old normalized, new) for the whole batch in one BLAS
+                    # call; NaN marks nodes without a previous embedding
+                    drift = np.full(len(batch), np.nan)
+                    has_old = np.array([e is not None for e in old_embeddings], dtype=bool)
+                    if has_old.any():
+                        old_mat = np.vstack([_to_vec(e) for e in old_embeddings if e is not None])
+                        # Normalize old vectors for fair comparison (new ones already are)
+                        old_norms = np.sqrt(np.einsum("ij,ij->i", old_mat, old_mat))[:, None]
+                        old_mat /= np.where(old_norms > 0, old_norms, 1.0)
+                        drift[has_old] = 1.0 - np.einsum(
+                            "ij,ij->i",
+                            old_mat,
+                            np.asarray(new_embeddings, dtype=np.float32)[has_old],
                         )
-                    elif drift_score > 0.01:
-                        logger.info(f"Node {node_id[:8]}... drift: {drift_score:.4f}")
 
-            if not dry_run:
-                conn.commit()
-                logger.info(f"Committed batch {i // batch_size + 1}")
+                    # Only write nodes the UPDATE would actually change (NaN drift compares
+                    # False, so nodes without a previous embedding are always written)
+                    recorded = np.array(
+                        [
+                            n["embedding_model"] == model_id and n["text_sha256"] == h
+                            for n, h in zip(batch, hashes, strict=True)
+                        ],
+                        dtype=bool,
+                    )
+                    changed = ~((drift <= min_drift) & recorded)
+                    unchanged_count += int((~changed).sum())
+                    drift_out = np.nan_to_num(drift, nan=0.0)
+                    update_rows = [
+                        (new_embeddings[j], float(drift_out[j]), hashes[j], model_id, node_ids[j])
+                        if track
+                        else (new_embeddings[j], float(drift_out[j]), node_ids[j])
+                        for j in np.flatnonzero(changed)
+                    ]
+                    updated_count += len(update_rows)
+
+                    # Log to embedding_history table (and monitoring) if drift is significant
+                    significant = np.flatnonzero((drift > 0.01) & changed)
+                    history_rows = [(node_ids[j], float(drift[j])) for j in significant]
+                    for j in significant:
+                        if drift[j] > 0.1:
+                            logger.warning(
+                                f"Node {str(node_ids[j])[:8]}... has significant drift: {drift[j]:.4f}"
+                            )
+                        else:
+                            logger.info(f"Node {str(node_ids[j])[:8]}... drift: {drift[j]:.4f}")
+
+                    if writer is not None and update_rows:
+                        _put(write_q, (batch_num, update_rows, history_rows), stop)
+            except BaseException:
+                stop.set()
+                raise
+            finally:
+                _put(write_q, _DONE, stop)
+
+        # Surface reader/writer failures (the writer rolls back its open batch on error)
+        reader.result()
+        if writer is not None:
+            writer.result()
+
+        if batch_num == 0:
+            logger.warning("No nodes found with text content")
+            return 0
 
-        logger.info(f"Re-embed complete: {updated_count} nodes updated")
+        logger.info(
+            f"Re-embed complete: {updated_count} nodes updated, "
+            f"{skipped_count} unchanged nodes skipped, "
+            f"{unchanged_count} re-encoded with drift <= {min_drift:g} left as is"
+        )
         return updated_count
 
     except Exception as e:
-        conn.rollback()
         logger.error(f"Re-embed failed: {e}")
         raise
     finally:
-        cur.close()
-        conn.close()
+        embedder.stop_pool()
 
 
 if __name__ == "__main__":
@@ -175,11 +369,37 @@ if __name__ == "__main__":
     parser.add_argument(
         "--backend",
         default="sentence-transformers",
-        choices=["sentence-transformers", "ollama"],
+        choices=["sentence-transformers", "onnx", "ollama"],
         help="Embedding backend",
     )
     parser.add_argument("--model", help="Model name (defaults based on backend)")
-    parser.add_argument("--batch-size", type=int, default=32, help="Batch size for processing")
+    parser.add_argument("--batch-size", type=int, default=32, help="Nodes per DB read/write batch")
+    parser.add_argument(
+        "--device",
+        default="cpu",
+        help="Encoding device for sentence-transformers (cpu, cuda, cuda:N, auto)",
+    )
+    parser.add_argument(
+        "--encode-batch",
+        type=int,
+        help="Model forward-pass batch size (default: 64 on CUDA, 32 on CPU)",
+    )
+    parser.add_argument(
+        "--devices",
+        help="Comma-separated devices for multi-process encoding (e.g. cuda:0,cuda:1 or cpu,cpu)",
+    )
+    parser.add_argument(
+        "--skip-unchanged",
+        action="store_true",
+        help="Resume an interrupted run: skip nodes whose text and model are unchanged since "
+        "this script last embedded them",
+    )
+    parser.add_argument(
+        "--min-drift",
+        type=float,
+        default=1e-6,
+        help="Don't rewrite already-recorded nodes whose drift is at or below this",
+    )
     parser.add_argument(
         "--dry-run", action="store_true", help="Don't update database, just show what would be done"
     )
@@ -192,6 +412,11 @@ if __name__ == "__main__":
         model_name=args.model,
         batch_size=args.batch_size,
         dry_run=args.dry_run,
+        device=args.device,
+        encode_batch_size=args.encode_batch,
+        devices=args.devices.split(",") if args.devices else None,
+        skip_unchanged=args.skip_unchanged,
+        min_drift=args.min_drift,
     )
 
     print(f"\n{'[DRY RUN] ' if args.dry_run else ''}Re-embedded {count} nodes")
@@ -22,13 +22,23 @@ import argparse
 import json
 import random
 import string
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import requests
+from requests.adapters import HTTPAdapter
 
+# One keep-alive session for every call; sized for the concurrent node posts below
+SESSION = requests.Session()
+_ADAPTER = HTTPAdapter(pool_connections=1, pool_maxsize=16)
+SESSION.mount("http://", _ADAPTER)
+SESSION.mount("https://", _ADAPTER)
 
-def rand_id(prefix: str) -> str:
-    return f"{prefix}_" + "".join(random.choices(string.ascii_lowercase + string.digits, k=8))
+
+def rand_ids(prefix: str, n: int) -> list[str]:
+    """Return n random IDs like ``<prefix>_x7k2m9qa`` from a single random draw."""
+    chars = "".join(random.choices(string.ascii_lowercase + string.digits, k=8 * n))
+    return [f"{prefix}_{chars[i : i + 8]}" for i in range(0, 8 * n, 8)]
 
 
 RESUMES: list[str] = [
@@ -58,14 +68,14 @@ def post_node(api: str, text: str, classes: list[str], tenant: str | None) -> st
     }
     if tenant:
         payload["tenant_id"] = tenant
-    r = requests.post(f"{api}/nodes", json=payload, timeout=10)
+    r = SESSION.post(f"{api}/nodes", json=payload, timeout=10)
     r.raise_for_status()
     return r.json()["id"]
 
 
 def register_trigger(api: str):
     try:
-        r = requests.post(
+        r = SESSION.post(
             f"{api}/triggers",
             json={
                 "name": "senior_java",
@@ -88,22 +98,33 @@ def load_seed_file(file_path: str) -> list[dict]:
         return json.load(f)
 
 
-def seed_from_file(api: str, file_path: str, tenant: str | None) -> dict[str, str]:
+def post_nodes(
+    api: str, texts: list[str], classes: list[list[str]], tenant: str | None, concurrency: int
+) -> list[str]:
+    """Create nodes with up to `concurrency` requests in flight; IDs come back in input order."""
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+        return list(
+            executor.map(
+                lambda tc: post_node(api, tc[0], tc[1], tenant), zip(texts, classes, strict=True)
+            )
+        )
+
+
+def seed_from_file(
+    api: str, file_path: str, tenant: str | None, concurrency: int = 8
+) -> dict[str, str]:
     """Seed nodes from file and return external_id -> UUID mapping."""
     nodes = load_seed_file(file_path)
     id_map = {}
-    created_ids = []
 
     print(f"Loading {len(nodes)} nodes from {file_path}...")
 
-    for node in nodes:
+    created_ids = post_nodes(
+        api, [n["text"] for n in nodes], [n["classes"] for n in nodes], tenant, concurrency
+    )
+    for node, uuid in zip(nodes, created_ids, strict=True):
         external_id = node["external_id"]
-        text = node["text"]
-        classes = node["classes"]
-
-        uuid = post_node(api, text, classes, tenant)
         id_map[external_id] = uuid
-        created_ids.append(uuid)
         print(f"  ✓ {external_id} → {uuid[:8]}...")
 
     print(f"✓ Created {len(created_ids)} nodes")
@@ -117,23 +138,18 @@ def seed_from_file(api: str, file_path: str, tenant: str | None) -> dict[str, st
     return id_map, created_ids
 
 
-def seed_random(api: str, tenant: str | None, num_resumes: int, num_jobs: int) -> list[str]:
+def seed_random(
+    api: str, tenant: str | None, num_resumes: int, num_jobs: int, concurrency: int = 8
+) -> list[str]:
     """Legacy random seeding."""
-    created_ids = []
-
-    # Create resumes
-    for _ in range(num_resumes):
-        text = random.choice(RESUMES)
-        text = f"{text} #{rand_id('cv')}"
-        nid = post_node(api, text, ["Resume"], tenant)
-        created_ids.append(nid)
-
-    # Create jobs
-    for _ in range(num_jobs):
-        text = random.choice(JOBS)
-        text = f"{text} #{rand_id('job')}"
-        nid = post_node(api, text, ["Job"], tenant)
-        created_ids.append(nid)
+    # Draw all texts and ID suffixes up front, resumes first then jobs
+    texts = [
+        f"{text} #{suffix}"
+        for pool, prefix, n in ((RESUMES, "cv", num_resumes), (JOBS, "job", num_jobs))
+        for text, suffix in zip(random.choices(pool, k=n), rand_ids(prefix, n), strict=True)
+    ]
+    classes = [["Resume"]] * num_resumes + [["Job"]] * num_jobs
+    created_ids = post_nodes(api, texts, classes, tenant, concurrency)
 
     print(f"✓ Created {len(created_ids)} nodes")
     return created_ids
@@ -150,6 +166,7 @@ def main():
     ap.add_argument(
         "--jobs", type=int, default=45, help="How many job nodes to create (random mode)"
     )
+    ap.add_argument("--concurrency", type=int, default=8, help="Concurrent node create requests")
     args = ap.parse_args()
 
     api = args.api_url.rstrip("/")
@@ -159,17 +176,17 @@ def main():
 
     if args.from_file:
         # Canonical seeding with ID mapping
-        id_map, created_ids = seed_from_file(api, args.from_file, tenant)
+        id_map, created_ids = seed_from_file(api, args.from_file, tenant, args.concurrency)
     else:
         # Legacy random seeding
-        created_ids = seed_random(api, tenant, args.resumes, args.jobs)
+        created_ids = seed_random(api, tenant, args.resumes, args.jobs, args.concurrency)
 
     # Register a sample trigger
     register_trigger(api)
 
     # Force background refresh for quick searchability
     try:
-        r = requests.post(f"{api}/admin/refresh", json=created_ids, timeout=60)
+        r = SESSION.post(f"{api}/admin/refresh", json=created_ids, timeout=60)
         if r.ok:
             data = r.json()
             print(f"✓ Forced refresh for {data.get('refreshed', 'N/A')} nodes (admin refresh)")
@@ -8,7 +8,8 @@ Usage:
 Behavior:
   - Reads ACTIVEKG_DSN to query Postgres for node IDs where <class> = ANY(classes)
   - Applies tenant context using RLS (SET LOCAL app.current_tenant_id)
-  - Calls /admin/refresh in batches with an admin token (HS256 by default)
+  - Calls /admin/refresh in batches with an admin token (HS256 by default), up to
+    --concurrency batches in flight over one keep-alive session
 
 Env vars:
   - ACTIVEKG_DSN (required)
@@ -20,29 +21,32 @@ Env vars:
 import argparse
 import os
 import sys
-from datetime import datetime, timedelta, timezone
+import time
+from collections import deque
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING
 
-import psycopg
-import requests
-
-try:
-    import jwt
-except Exception:
-    jwt = None
+# psycopg, requests and PyJWT are imported where used so --help and missing-env exits
+# don't pay for loading them (PyJWT pulls in cryptography/OpenSSL)
+if TYPE_CHECKING:
+    import requests
 
 
 def make_admin_token(tenant_id: str) -> str:
     jwt_enabled = os.getenv("JWT_ENABLED", "true").lower() == "true"
     if not jwt_enabled:
         return ""
-    if jwt is None:
+    try:
+        import jwt
+    except ImportError:
         print("⚠️  PyJWT not installed; proceeding without token (JWT_ENABLED may be false)")
         return ""
     secret = os.getenv("JWT_SECRET_KEY", "dev-secret-key-min-32-chars-long-for-testing")
     algorithm = os.getenv("JWT_ALGORITHM", "HS256")
     audience = os.getenv("JWT_AUDIENCE", "activekg")
     issuer = os.getenv("JWT_ISSUER", "https://staging-auth.yourcompany.com")
-    now = datetime.now(timezone.utc)
+    now = int(time.time())  # NumericDate seconds
     payload = {
         "sub": "admin_batch_refresh",
         "tenant_id": tenant_id,
@@ -52,33 +56,38 @@ def make_admin_token(tenant_id: str) -> str:
         "iss": issuer,
         "iat": now,
         "nbf": now,
-        "exp": now + timedelta(hours=1),
+        "exp": now + 3600,
     }
     return jwt.encode(payload, secret, algorithm=algorithm)
 
 
-def fetch_node_ids(dsn: str, node_class: str, tenant_id: str, limit: int | None) -> list[str]:
-    ids: list[str] = []
+def fetch_node_ids(
+    dsn: str, node_class: str, tenant_id: str, limit: int | None, batch_size: int
+) -> Iterator[list[str]]:
+    """Yield node IDs in batches of batch_size, streamed from a server-side cursor."""
+    import psycopg
+
     with psycopg.connect(dsn) as conn:
-        with conn.cursor() as cur:
-            # Apply tenant context for RLS (SET LOCAL cannot be parameterized; use set_config)
-            cur.execute("SELECT set_config('app.current_tenant_id', %s, true)", (tenant_id,))
+        # Apply tenant context for RLS (SET LOCAL cannot be parameterized; use set_config).
+        # It is transaction-local, and the named cursor below runs in the same transaction.
+        conn.execute("SELECT set_config('app.current_tenant_id', %s, true)", (tenant_id,))
+        with conn.cursor(name="admin_refresh_stream") as cur:
+            cur.itersize = batch_size
             sql = "SELECT id FROM nodes WHERE %s = ANY(classes) ORDER BY created_at DESC"
             if limit and limit > 0:
                 sql += " LIMIT %s"
                 cur.execute(sql, (node_class, limit))
             else:
                 cur.execute(sql, (node_class,))
-            for row in cur.fetchall():
-                ids.append(str(row[0]))
-    return ids
+            while rows := cur.fetchmany(batch_size):
+                yield [str(row[0]) for row in rows]
 
 
-def post_refresh(api_url: str, token: str, batch: list[str]) -> bool:
+def post_refresh(session: "requests.Session", api_url: str, token: str, batch: list[str]) -> bool:
     headers = {"Content-Type": "application/json"}
     if token:
         headers["Authorization"] = f"Bearer {token}"
-    r = requests.post(
+    r = session.post(
         f"{api_url}/admin/refresh", json={"node_ids": batch}, headers=headers, timeout=60
     )
     if r.status_code != 200:
@@ -101,6 +110,9 @@ def main():
     parser.add_argument(
         "--limit", type=int, default=0, help="Limit number of nodes to refresh (0 = all)"
     )
+    parser.add_argument(
+        "--concurrency", type=int, default=4, help="Concurrent /admin/refresh requests"
+    )
     parser.add_argument("--dry-run", action="store_true", help="List node IDs without refreshing")
     args = parser.parse_args()
 
@@ -116,35 +128,57 @@ def main():
     print(f"API URL:     {api_url}")
     print(f"DSN:         {dsn}")
 
-    # Collect IDs
-    ids = fetch_node_ids(
-        dsn, args.node_class, args.tenant_id, args.limit if args.limit and args.limit > 0 else None
+    # Stream IDs; each batch is refreshed as soon as it is read
+    batches = fetch_node_ids(
+        dsn,
+        args.node_class,
+        args.tenant_id,
+        args.limit if args.limit and args.limit > 0 else None,
+        args.batch_size,
     )
-    if not ids:
-        print("No nodes found for the given class and tenant.")
-        return
 
-    print(f"Found {len(ids)} nodes of class '{args.node_class}'.")
     if args.dry_run:
-        for i in ids[:10]:
-            print(f"  - {i}")
-        if len(ids) > 10:
-            print(f"  ... (+{len(ids) - 10} more)")
+        total = 0
+        for batch in batches:
+            for i in batch[: max(0, 10 - total)]:
+                print(f"  - {i}")
+            total += len(batch)
+        if total > 10:
+            print(f"  ... (+{total - 10} more)")
+        if not total:
+            print("No nodes found for the given class and tenant.")
+            return
+        print(f"Found {total} nodes of class '{args.node_class}'.")
         return
 
+    import requests
+    from requests.adapters import HTTPAdapter
+
     token = make_admin_token(args.tenant_id)
 
-    # Refresh in batches
+    # Refresh in batches over pooled keep-alive connections (a failed batch is reported and
+    # the rest continue). In-flight batches are capped so IDs are not read far ahead.
+    concurrency = max(1, args.concurrency)
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=concurrency)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+
     total = 0
-    for i in range(0, len(ids), args.batch_size):
-        batch = ids[i : i + args.batch_size]
-        ok = post_refresh(api_url, token, batch)
-        if not ok:
-            # continue with next batch
-            pass
-        total += len(batch)
-
-    print(f"Done. Requested refresh for {total} nodes.")
+    with session, ThreadPoolExecutor(max_workers=concurrency) as executor:
+        pending: deque = deque()
+        for batch in batches:
+            if len(pending) >= 2 * concurrency:
+                pending.popleft().result()
+            pending.append(executor.submit(post_refresh, session, api_url, token, batch))
+            total += len(batch)
+        for future in pending:
+            future.result()
+
+    if not total:
+        print("No nodes found for the given class and tenant.")
+        return
+    print(f"Done. Requested refresh for {total} nodes of class '{args.node_class}'.")
 
 
 if __name__ == "__main__":
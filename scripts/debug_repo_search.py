@@ -8,11 +8,34 @@ Usage:
 """
 
 import argparse
+import hashlib
 import os
+from pathlib import Path
+
+import numpy as np
 
 from activekg.engine.embedding_provider import EmbeddingProvider
 from activekg.graph.repository import GraphRepository
 
+# Query vectors cached across runs; a hit also skips loading the embedding model
+CACHE_DIR = Path(os.getenv("XDG_CACHE_HOME", Path.home() / ".cache")) / "activekg" / "query_vec"
+
+
+def encode_query(embedder: EmbeddingProvider, query: str) -> np.ndarray:
+    key = hashlib.sha256(f"{embedder.backend}|{embedder.model_name}|{query}".encode()).hexdigest()
+    path = CACHE_DIR / f"{key}.npy"
+    try:
+        return np.load(path)
+    except (OSError, ValueError):
+        pass
+    qv = embedder.encode([query])[0]
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        np.save(path, qv)
+    except OSError:
+        pass  # caching is best-effort
+    return qv
+
 
 def main():
     ap = argparse.ArgumentParser()
@@ -28,7 +51,9 @@ def main():
     tenant = os.getenv("TENANT")
     print(f"DSN set, tenant={tenant}")
 
-    repo = GraphRepository(dsn)
+    # One warm connection serves the RLS check and the search (pgvector is registered by the
+    # pool's configure hook when it opens)
+    repo = GraphRepository(dsn, pool_min_size=1, pool_max_size=4)
     embedder = EmbeddingProvider()
 
     # Verify tenant context via a direct call
@@ -39,7 +64,7 @@ def main():
             cur.execute("SELECT COUNT(*) FROM nodes")
             print("visible nodes:", cur.fetchone()[0])
 
-    qv = embedder.encode([args.query])[0]
+    qv = encode_query(embedder, args.query)
     if args.hybrid:
         res = repo.hybrid_search(args.query, qv, top_k=args.topk, tenant_id=tenant)
     else:
@@ -1,37 +1,141 @@
 #!/usr/bin/env python3
-"""Generate test JWT tokens for backend testing."""
+"""Generate test JWT tokens for backend testing.
 
+HS256 signs with JWT_SECRET_KEY. For RS256 (the API's production default), set
+JWT_ALGORITHM=RS256 and JWT_PRIVATE_KEY_PATH to a PEM private key matching the API's
+JWT_PUBLIC_KEY.
+"""
+
+import base64
+import functools
+import hashlib
+import hmac
+import json
 import os
-from datetime import datetime, timedelta, timezone
+import time
+from pathlib import Path
+
+# PyJWT (and the cryptography/OpenSSL stack behind it) is only imported for non-HMAC
+# tokens; HS256/384/512 signing and cache checks use the stdlib
 
-import jwt
+try:
+    import orjson
+except ImportError:  # optional: faster claims serialization
+    orjson = None
 
 # Load from environment
 SECRET_KEY = os.getenv("JWT_SECRET_KEY", "test-secret-key-min-32-chars-long-for-testing-purposes")
 ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")
 AUDIENCE = os.getenv("JWT_AUDIENCE", "activekg")
 ISSUER = os.getenv("JWT_ISSUER", "https://test-auth.activekg.local")
+PRIVATE_KEY_PATH = os.getenv("JWT_PRIVATE_KEY_PATH")
+
+ADMIN_SCOPES = ["search:read", "ask:read", "kg:write", "admin:refresh"]
+CACHE_DIR = Path(os.getenv("XDG_CACHE_HOME", Path.home() / ".cache")) / "activekg"
+
+# Claims identical in every token, built once; generate_token only adds the per-token ones
+_STATIC_CLAIMS = {"name": "Test User", "aud": AUDIENCE, "iss": ISSUER}
+_TOKEN_TTL = 24 * 3600  # seconds
+
+
+@functools.lru_cache(maxsize=4)
+def load_private_key(path):
+    """Parse a PEM private key once; PyJWT would otherwise re-parse the PEM on every encode."""
+    from cryptography.hazmat.primitives.serialization import load_pem_private_key
+
+    return load_pem_private_key(Path(path).read_bytes(), password=None)
+
+
+def _b64url(data: bytes) -> bytes:
+    return base64.urlsafe_b64encode(data).rstrip(b"=")
+
+
+# JWS alg -> hashlib digest name for the HMAC algorithms
+HMAC_DIGESTS = {"HS256": "sha256", "HS384": "sha384", "HS512": "sha512"}
+_SECRET_KEY_BYTES = SECRET_KEY.encode()
+
+
+@functools.lru_cache(maxsize=len(HMAC_DIGESTS))
+def _jws_header(alg: str) -> bytes:
+    return _b64url(json.dumps({"alg": alg, "typ": "JWT"}, separators=(",", ":")).encode())
+
+
+def encode_hs_jwt(claims: bytes, secret: bytes, alg: str = "HS256") -> str:
+    """Sign serialized JSON claims as an HMAC JWT (HS256/HS384/HS512) without PyJWT.
+
+    Produces the same compact JWS as jwt.encode for the same claims JSON.
+    """
+    signing_input = _jws_header(alg) + b"." + _b64url(claims)
+    signature = hmac.digest(secret, signing_input, HMAC_DIGESTS[alg])
+    return (signing_input + b"." + _b64url(signature)).decode()
+
+
+def _claims_json(payload) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload, separators=(",", ":")).encode()
+
+
+def _signing_key():
+    if ALGORITHM.startswith("HS"):
+        return SECRET_KEY
+    if not PRIVATE_KEY_PATH:
+        raise SystemExit(f"JWT_PRIVATE_KEY_PATH is required for {ALGORITHM} tokens")
+    return load_private_key(PRIVATE_KEY_PATH)
 
 
 def generate_token(tenant_id="test_tenant", scopes=None, user_id="test-user"):
     """Generate a JWT token for testing."""
-    if scopes is None:
-        scopes = ["search:read", "ask:read", "kg:write", "admin:refresh"]
-
-    now = datetime.now(timezone.utc)
+    now = int(time.time())  # NumericDate seconds, what jwt.encode would convert datetimes to
     payload = {
+        **_STATIC_CLAIMS,
         "sub": user_id,
         "tenant_id": tenant_id,
-        "scopes": scopes,
+        "scopes": ADMIN_SCOPES if scopes is None else scopes,
         "email": f"{user_id}@test.com",
-        "name": "Test User",
         "iat": now,
-        "exp": now + timedelta(hours=24),
-        "aud": AUDIENCE,
-        "iss": ISSUER,
+        "exp": now + _TOKEN_TTL,
     }
 
-    token = jwt.encode(payload, SECRET_KEY, algorithm=ALGORITHM)
+    if ALGORITHM in HMAC_DIGESTS:
+        return encode_hs_jwt(_claims_json(payload), _SECRET_KEY_BYTES, ALGORITHM)
+    import jwt
+
+    token = jwt.encode(payload, _signing_key(), algorithm=ALGORITHM)
+    return token
+
+
+def mint_admin_token(tenant_id="test_tenant", min_ttl=60):
+    """Return an admin token, reusing a cached one until it has under min_ttl seconds left.
+
+    Tokens are cached under ~/.cache/activekg, keyed by tenant and signing settings so a
+    changed secret or audience never reuses a stale token.
+    """
+    key = hashlib.blake2b(
+        f"{tenant_id}|{SECRET_KEY}|{PRIVATE_KEY_PATH}|{ALGORITHM}|{AUDIENCE}|{ISSUER}".encode(),
+        digest_size=8,
+    ).hexdigest()
+    cache_file = CACHE_DIR / f"admin-{key}.jwt"
+    try:
+        token = cache_file.read_text().strip()
+        # Only exp is needed (the API verifies the signature), so decode the claims directly
+        body = token.split(".")[1]
+        claims = json.loads(base64.urlsafe_b64decode(body + "=" * (-len(body) % 4)))
+        if claims["exp"] - time.time() > min_ttl:
+            return token
+    except (OSError, IndexError, KeyError, TypeError, ValueError):
+        pass
+
+    token = generate_token(tenant_id=tenant_id, scopes=ADMIN_SCOPES)
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        # Created owner-only, so the token is never readable by others, even briefly
+        fd = os.open(cache_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        os.fchmod(fd, 0o600)  # an existing file keeps its old mode under O_CREAT
+        with os.fdopen(fd, "w") as f:
+            f.write(token)
+    except OSError:
+        pass  # caching is best-effort
     return token
 
 
@@ -41,9 +145,7 @@ if __name__ == "__main__":
     tenant = sys.argv[1] if len(sys.argv) > 1 else "test_tenant"
 
     # Generate admin token (with admin:refresh scope)
-    admin_token = generate_token(
-        tenant_id=tenant, scopes=["search:read", "ask:read", "kg:write", "admin:refresh"]
-    )
+    admin_token = generate_token(tenant_id=tenant, scopes=ADMIN_SCOPES)
     print(f"Admin Token: {admin_token}")
 
     # Generate regular user token (without admin:refresh)
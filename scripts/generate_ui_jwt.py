@@ -1,9 +1,10 @@
 #!/usr/bin/env python3
 """Generate JWT token for UI access to seeded test data."""
 
-from datetime import datetime, timedelta, timezone
+import json
+import time
 
-import jwt
+from generate_test_jwt import encode_hs_jwt
 
 # Configuration from .env.test
 JWT_SECRET = "test-secret-key-min-32-chars-long-for-testing-purposes"
@@ -13,22 +14,28 @@ JWT_ISSUER = "https://test-auth.activekg.local"
 TENANT_ID = "test-tenant"
 
 
+# Every claim except iat/nbf/exp is fixed, so the claims JSON up to the timestamps is
+# rendered once; minting a token is then one format plus one HMAC
+_STATIC_CLAIMS = {
+    "sub": "ui_user",
+    "tenant_id": TENANT_ID,
+    "actor_type": "user",
+    "scopes": ["search:read", "ask:read", "kg:write", "admin:refresh"],
+    "aud": JWT_AUDIENCE,
+    "iss": JWT_ISSUER,
+}
+_CLAIMS_TEMPLATE = (
+    json.dumps(_STATIC_CLAIMS, separators=(",", ":"))[:-1] + ',"iat":%d,"nbf":%d,"exp":%d}'
+).encode()
+_SECRET_BYTES = JWT_SECRET.encode()
+_TTL_SECONDS = 24 * 3600  # Valid for 24 hours
+
+
 def generate_ui_token():
-    """Generate JWT token for UI access."""
-    now = datetime.now(timezone.utc)
-    payload = {
-        "sub": "ui_user",
-        "tenant_id": TENANT_ID,
-        "actor_type": "user",
-        "scopes": ["search:read", "ask:read", "kg:write", "admin:refresh"],
-        "aud": JWT_AUDIENCE,
-        "iss": JWT_ISSUER,
-        "iat": now,
-        "nbf": now,
-        "exp": now + timedelta(hours=24),  # Valid for 24 hours
-    }
-    token = jwt.encode(payload, JWT_SECRET, algorithm=JWT_ALG)
-    return token
+    """Generate JWT token for UI access (same compact JWS jwt.encode would produce)."""
+    now = int(time.time())  # NumericDate seconds
+    claims = _CLAIMS_TEMPLATE % (now, now, now + _TTL_SECONDS)
+    return encode_hs_jwt(claims, _SECRET_BYTES, JWT_ALG)
 
 
 if __name__ == "__main__":
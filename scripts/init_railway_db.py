@@ -7,15 +7,24 @@ Run this from the Railway environment where ACTIVEKG_DSN is available.
 import os
 import sys
 import time
+from pathlib import Path
+from typing import TYPE_CHECKING
 
-import psycopg
+# psycopg is imported on first connect so a missing DSN fails fast without loading it
+if TYPE_CHECKING:
+    import psycopg
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+MIGRATIONS_DIR = REPO_ROOT / "db" / "migrations"
 
 MAX_RETRIES = 10
 RETRY_DELAY = 3  # seconds
 
 
-def _connect_with_retry(dsn: str) -> psycopg.Connection:
+def _connect_with_retry(dsn: str) -> "psycopg.Connection":
     """Try connecting to the database with retries (Railway services start concurrently)."""
+    import psycopg
+
     for attempt in range(1, MAX_RETRIES + 1):
         try:
             return psycopg.connect(dsn, autocommit=True)
@@ -40,10 +49,17 @@ def main():
         # Connect to database (with retry for Railway cold starts)
         with _connect_with_retry(dsn) as conn:
             with conn.cursor() as cur:
-                # Check if pgvector is available
+                # Probe pgvector availability and existing schema in one round-trip
                 print("Checking pgvector extension availability...")
-                cur.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'vector';")
-                if not cur.fetchone():
+                cur.execute(
+                    """
+                    SELECT
+                        EXISTS(SELECT 1 FROM pg_available_extensions WHERE name = 'vector'),
+                        EXISTS(SELECT 1 FROM information_schema.tables WHERE table_name = 'nodes')
+                    """
+                )
+                has_vector, schema_exists = cur.fetchone()
+                if not has_vector:
                     print("ERROR: pgvector extension is not available in this PostgreSQL instance")
                     print("Railway's default PostgreSQL doesn't include pgvector.")
                     print("\nPlease deploy a PostgreSQL instance with pgvector:")
@@ -62,31 +78,22 @@ def main():
                 cur.execute("CREATE EXTENSION IF NOT EXISTS pgcrypto;")
                 print("✓ Extensions created")
 
-                # Check if schema is already initialized
-                cur.execute("SELECT 1 FROM information_schema.tables WHERE table_name = 'nodes';")
-                schema_exists = cur.fetchone() is not None
-
                 if schema_exists:
                     print("✓ Database schema already initialized (skipping init.sql)")
                 else:
                     # Read and execute init.sql
                     print("Initializing database schema...")
-                    init_sql_path = os.path.join(os.path.dirname(__file__), "..", "db", "init.sql")
-                    with open(init_sql_path) as f:
-                        sql = f.read()
+                    sql = (REPO_ROOT / "db" / "init.sql").read_text()
 
                     # Execute schema creation
                     cur.execute(sql)
                     print("✓ Database schema initialized")
 
                 # Check if RLS policies file exists
-                rls_sql_path = os.path.join(
-                    os.path.dirname(__file__), "..", "enable_rls_policies.sql"
-                )
-                if os.path.exists(rls_sql_path):
+                rls_sql_path = REPO_ROOT / "enable_rls_policies.sql"
+                if rls_sql_path.exists():
                     print("Applying RLS policies...")
-                    with open(rls_sql_path) as f:
-                        sql = f.read()
+                    sql = rls_sql_path.read_text()
                     try:
                         cur.execute(sql)
                         print("✓ RLS policies applied")
@@ -97,7 +104,10 @@ def main():
                         else:
                             raise
 
-                # Apply migrations (idempotent - safe to run multiple times)
+                # Apply migrations (idempotent - safe to run multiple times). Order matters and
+                # they run serially on this one connection: most alter or index `nodes` and
+                # would only queue on its table lock if run concurrently, and the
+                # connector_configs ones (005 -> 006 -> 007) build on each other
                 migrations = [
                     "001_add_embedding_history_index.sql",
                     "004_add_external_id_index.sql",
@@ -109,11 +119,14 @@ def main():
                     "009_embedding_queue_status.sql",
                     "010_update_text_search_vector.sql",
                     "011_unique_tenant_external_id.sql",
+                    "016_node_text_sha256.sql",
                 ]
                 applied = 0
                 skipped = 0
 
                 def execute_sql(sql_text: str, *, split_statements: bool = False) -> None:
+                    # Without parameters the whole script goes as one simple-query message:
+                    # one round-trip, statements run in order server-side
                     if not split_statements:
                         cur.execute(sql_text)
                         return
@@ -134,14 +147,11 @@ def main():
                         cur.execute(stmt)
 
                 for migration_file in migrations:
-                    migration_path = os.path.join(
-                        os.path.dirname(__file__), "..", "db", "migrations", migration_file
-                    )
-                    if os.path.exists(migration_path):
+                    migration_path = MIGRATIONS_DIR / migration_file
+                    if migration_path.exists():
                         print(f"Applying migration: {migration_file}...")
                         try:
-                            with open(migration_path) as f:
-                                sql = f.read()
+                            sql = migration_path.read_text()
                             needs_split = "create index concurrently" in sql.lower()
                             execute_sql(sql, split_statements=needs_split)
                             print(f"✓ Migration {migration_file} applied")
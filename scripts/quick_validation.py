@@ -2,26 +2,25 @@
 """Quick validation script for corrected endpoints."""
 
 import json
-import subprocess
+import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
 
 import requests
 
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from generate_test_jwt import mint_admin_token
+
 API_URL = "http://localhost:8000"
 
-# Generate tokens
+# Mint the admin token in-process (cached across runs until it nears expiry)
 print("Generating JWT tokens...")
-result = subprocess.run(["python3", "scripts/generate_test_jwt.py"], capture_output=True, text=True)
-lines = result.stdout.split("\n")
-ADMIN_TOKEN = None
-for line in lines:
-    if "Admin Token:" in line:
-        ADMIN_TOKEN = line.split("Admin Token:")[1].strip()
-        break
+ADMIN_TOKEN = mint_admin_token()
 
-if not ADMIN_TOKEN:
-    print("Failed to generate token!")
-    sys.exit(1)
+# One keep-alive session for every request
+SESSION = requests.Session()
+SESSION.headers["Authorization"] = f"Bearer {ADMIN_TOKEN}"
 
 
 def test(name, func):
@@ -43,24 +42,35 @@ print("=" * 60 + "\n")
 
 # 1. Schema/indexes/RLS
 def check_migrate():
-    resp = requests.post(
-        f"{API_URL}/admin/migrate", headers={"Authorization": f"Bearer {ADMIN_TOKEN}"}, timeout=30
-    )
+    resp = SESSION.post(f"{API_URL}/admin/migrate", timeout=30)
     data = resp.json()
     print(f"  Migrate response: {json.dumps(data, indent=2)}")
     return resp.status_code == 200 and data.get("status") == "ok"
 
 
 def check_db_status():
-    resp = requests.get(
-        f"{API_URL}/admin/db_status", headers={"Authorization": f"Bearer {ADMIN_TOKEN}"}, timeout=10
-    )
+    resp = PROBES["db_status"].result()
     data = resp.json()
     print(f"  DB Status: {json.dumps(data, indent=2)}")
     return resp.status_code == 200
 
 
 test("POST /admin/migrate", check_migrate)
+
+# Read-only probes don't depend on the CRUD below, so fire them together now and let the
+# tests that report on them pick up the responses (keeps output in the usual order)
+_executor = ThreadPoolExecutor(max_workers=4)
+PROBES = {
+    name: _executor.submit(SESSION.get, f"{API_URL}{path}", timeout=10)
+    for name, path in (
+        ("db_status", "/admin/db_status"),
+        ("triggers", "/triggers"),
+        ("connectors", "/_admin/connectors/"),
+        ("cache_health", "/_admin/connectors/cache/health"),
+    )
+}
+_executor.shutdown(wait=False)
+
 test("GET /admin/db_status", check_db_status)
 
 # 2. Node CRUD with corrected hard delete
@@ -70,9 +80,8 @@ node_id = None
 
 def create_node():
     global node_id
-    resp = requests.post(
+    resp = SESSION.post(
         f"{API_URL}/nodes",
-        headers={"Authorization": f"Bearer {ADMIN_TOKEN}", "Content-Type": "application/json"},
         json={"class_name": "QuickTest", "text": "Quick validation test node"},
         timeout=10,
     )
@@ -83,16 +92,13 @@ def create_node():
 
 
 def get_node():
-    resp = requests.get(
-        f"{API_URL}/nodes/{node_id}", headers={"Authorization": f"Bearer {ADMIN_TOKEN}"}, timeout=10
-    )
+    resp = SESSION.get(f"{API_URL}/nodes/{node_id}", timeout=10)
     return resp.status_code == 200
 
 
 def update_node():
-    resp = requests.put(
+    resp = SESSION.put(
         f"{API_URL}/nodes/{node_id}",
-        headers={"Authorization": f"Bearer {ADMIN_TOKEN}", "Content-Type": "application/json"},
         json={"properties": {"validated": True}},
         timeout=10,
     )
@@ -101,9 +107,8 @@ def update_node():
 
 def delete_node_hard():
     # Create another node for hard delete
-    resp = requests.post(
+    resp = SESSION.post(
         f"{API_URL}/nodes",
-        headers={"Authorization": f"Bearer {ADMIN_TOKEN}", "Content-Type": "application/json"},
         json={"class_name": "ToDelete", "text": "Will be hard deleted"},
         timeout=10,
     )
@@ -112,11 +117,7 @@ def delete_node_hard():
     delete_id = resp.json().get("id")
 
     # Hard delete with correct param
-    resp2 = requests.delete(
-        f"{API_URL}/nodes/{delete_id}?hard=true",
-        headers={"Authorization": f"Bearer {ADMIN_TOKEN}"},
-        timeout=10,
-    )
+    resp2 = SESSION.delete(f"{API_URL}/nodes/{delete_id}?hard=true", timeout=10)
     print(f"  Hard delete node {delete_id}: {resp2.status_code}")
     return resp2.status_code == 200
 
@@ -132,18 +133,15 @@ print("\nTrigger Tests:")
 
 
 def list_triggers():
-    resp = requests.get(
-        f"{API_URL}/triggers", headers={"Authorization": f"Bearer {ADMIN_TOKEN}"}, timeout=10
-    )
+    resp = PROBES["triggers"].result()
     data = resp.json()
     print(f"  Existing triggers: {len(data.get('triggers', []))}")
     return resp.status_code == 200
 
 
 def create_trigger():
-    resp = requests.post(
+    resp = SESSION.post(
         f"{API_URL}/triggers",
-        headers={"Authorization": f"Bearer {ADMIN_TOKEN}", "Content-Type": "application/json"},
         json={
             "name": "validation_trigger",
             "example_text": "This is a validation test",
@@ -164,9 +162,8 @@ print("\nSearch & Q&A Tests:")
 
 
 def test_search():
-    resp = requests.post(
+    resp = SESSION.post(
         f"{API_URL}/search",
-        headers={"Authorization": f"Bearer {ADMIN_TOKEN}", "Content-Type": "application/json"},
         json={"query": "validation test", "mode": "weighted", "top_k": 10},
         timeout=15,
     )
@@ -176,9 +173,8 @@ def test_search():
 
 
 def test_ask():
-    resp = requests.post(
+    resp = SESSION.post(
         f"{API_URL}/ask",
-        headers={"Authorization": f"Bearer {ADMIN_TOKEN}", "Content-Type": "application/json"},
         json={"question": "What is a validation test?", "top_k": 5},
         timeout=30,
     )
@@ -196,22 +192,14 @@ print("\nConnector Admin Tests:")
 
 
 def test_connectors_list():
-    resp = requests.get(
-        f"{API_URL}/_admin/connectors/",
-        headers={"Authorization": f"Bearer {ADMIN_TOKEN}"},
-        timeout=10,
-    )
+    resp = PROBES["connectors"].result()
     data = resp.json() if resp.status_code == 200 else {}
     print(f"  Connectors: {len(data.get('connectors', []))}")
     return resp.status_code == 200
 
 
 def test_cache_health():
-    resp = requests.get(
-        f"{API_URL}/_admin/connectors/cache/health",
-        headers={"Authorization": f"Bearer {ADMIN_TOKEN}"},
-        timeout=10,
-    )
+    resp = PROBES["cache_health"].result()
     data = resp.json() if resp.status_code == 200 else {}
     print(f"  Cache status: {data.get('status', 'unknown')}")
     return resp.status_code == 200
@@ -10,9 +10,30 @@ Seeds:
 import time
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import orjson
+except ImportError:  # optional: faster request/response (de)serialization
+    orjson = None
 
 API_URL = "http://localhost:8000"
 
+# One keep-alive session for every call; gateway errors while the API is still starting
+# are retried with backoff (urllib3's default allowed_methods never replays a POST)
+SESSION = requests.Session()
+_ADAPTER = HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=16,
+    max_retries=Retry(total=3, backoff_factor=0.2, status_forcelist=(502, 503, 504)),
+)
+SESSION.mount("http://", _ADAPTER)
+SESSION.mount("https://", _ADAPTER)
+JSON_HEADERS = {"Content-Type": "application/json"}
+# (connect, read): fail fast when nothing is listening, stay patient with a slow response
+HEALTH_TIMEOUT = (0.5, 5)
+
 # Open positions data
 OPEN_POSITIONS = [
     {
@@ -120,6 +141,27 @@ PERFORMANCE_ISSUES = [
 ]
 
 
+def embedder_loaded(health):
+    """True once /health reports the embedding model loaded (or the server predates the field)."""
+    embedder = health.get("components", {}).get("embedder")
+    return embedder is None or embedder.get("status") == "loaded"
+
+
+def report(items, results, kind):
+    """Print one line per seeded item, in order, as a single write."""
+    total = len(items)
+    lines = []
+    for i, (item, result) in enumerate(zip(items, results, strict=True), 1):
+        if "id" in result:
+            lines.append(
+                f"  [{i}/{total}] ✓ Created {kind}: {item['props']['title']} (ID: {result['id']})"
+            )
+        else:
+            lines.append(f"  [{i}/{total}] ❌ Failed: {result.get('error', 'unknown error')}")
+    if lines:
+        print("\n".join(lines))
+
+
 def seed_data():
     """Seed test data for structured queries."""
     print(f"Seeding structured test data to {API_URL}")
@@ -127,48 +169,51 @@ def seed_data():
 
     # Check API health
     try:
-        resp = requests.get(f"{API_URL}/health", timeout=5)
+        resp = SESSION.get(f"{API_URL}/health", timeout=HEALTH_TIMEOUT)
         if resp.status_code != 200:
             print(f"❌ API health check failed: HTTP {resp.status_code}")
             return
-        print("✓ API is healthy\n")
+        print("✓ API is healthy")
+        # The model loads in the background at API startup; embeddings for the seeded
+        # nodes are computed as soon as it is ready, so give it up to 30s
+        deadline = time.monotonic() + 30
+        while not embedder_loaded(resp.json()) and time.monotonic() < deadline:
+            time.sleep(2)
+            resp = SESSION.get(f"{API_URL}/health", timeout=HEALTH_TIMEOUT)
+        if embedder_loaded(resp.json()):
+            print("✓ Embedding model loaded\n")
+        else:
+            print("⚠ Embedding model still loading; embeddings will lag\n")
     except Exception as e:
         print(f"❌ Cannot connect to API: {e}")
         return
 
-    # Seed open positions
-    print(f"Seeding {len(OPEN_POSITIONS)} open positions...")
-    for i, position in enumerate(OPEN_POSITIONS, 1):
-        try:
-            resp = requests.post(f"{API_URL}/nodes", json=position, timeout=10)
-            if resp.status_code == 200:
-                node_id = resp.json().get("id")
-                print(
-                    f"  [{i}/{len(OPEN_POSITIONS)}] ✓ Created position: {position['props']['title']} (ID: {node_id})"
-                )
-            else:
-                print(f"  [{i}/{len(OPEN_POSITIONS)}] ❌ Failed: HTTP {resp.status_code}")
-        except Exception as e:
-            print(f"  [{i}/{len(OPEN_POSITIONS)}] ❌ Error: {e}")
-        time.sleep(0.5)  # Rate limiting
+    # Both groups go in one /nodes/batch request: one round-trip, and the API embeds the
+    # whole batch with a single encoder call. Results come back in request order.
+    nodes = OPEN_POSITIONS + PERFORMANCE_ISSUES
+    # Serialized once, straight to bytes, when orjson is available
+    if orjson is not None:
+        body = {"data": orjson.dumps({"nodes": nodes}), "headers": JSON_HEADERS}
+    else:
+        body = {"json": {"nodes": nodes}}
+    try:
+        resp = SESSION.post(f"{API_URL}/nodes/batch", timeout=30, **body)
+    except Exception as e:
+        print(f"❌ Batch create failed: {e}")
+        return
+    if resp.status_code != 200:
+        print(f"❌ Batch create failed: HTTP {resp.status_code} - {resp.text}")
+        return
+    results = (orjson.loads(resp.content) if orjson is not None else resp.json())["results"]
+    if len(results) != len(nodes):
+        print(f"❌ Batch create returned {len(results)} results for {len(nodes)} nodes")
+        return
 
+    print(f"Seeding {len(OPEN_POSITIONS)} open positions...")
+    report(OPEN_POSITIONS, results[: len(OPEN_POSITIONS)], "position")
     print()
-
-    # Seed performance issues
     print(f"Seeding {len(PERFORMANCE_ISSUES)} performance issues...")
-    for i, issue in enumerate(PERFORMANCE_ISSUES, 1):
-        try:
-            resp = requests.post(f"{API_URL}/nodes", json=issue, timeout=10)
-            if resp.status_code == 200:
-                node_id = resp.json().get("id")
-                print(
-                    f"  [{i}/{len(PERFORMANCE_ISSUES)}] ✓ Created issue: {issue['props']['title']} (ID: {node_id})"
-                )
-            else:
-                print(f"  [{i}/{len(PERFORMANCE_ISSUES)}] ❌ Failed: HTTP {resp.status_code}")
-        except Exception as e:
-            print(f"  [{i}/{len(PERFORMANCE_ISSUES)}] ❌ Error: {e}")
-        time.sleep(0.5)  # Rate limiting
+    report(PERFORMANCE_ISSUES, results[len(OPEN_POSITIONS) :], "issue")
 
     print()
     print("=" * 70)
@@ -1,12 +1,13 @@
 #!/usr/bin/env python3
 """Test JWT request to /ask endpoint."""
 
-from datetime import datetime, timedelta, timezone
+import time
 
 import jwt
 import requests
 
 # Generate token with search:read scope
+now = int(time.time())  # NumericDate seconds, read once for iat/nbf/exp
 payload = {
     "sub": "eval_user",
     "tenant_id": "eval_tenant",
@@ -14,9 +15,9 @@ payload = {
     "scopes": ["search:read"],
     "aud": "activekg",
     "iss": "https://staging-auth.yourcompany.com",
-    "iat": datetime.now(timezone.utc),
-    "nbf": datetime.now(timezone.utc),
-    "exp": datetime.now(timezone.utc) + timedelta(hours=1),
+    "iat": now,
+    "nbf": now,
+    "exp": now + 3600,
 }
 secret = "dev-secret-key-min-32-chars-long-for-testing"
 token = jwt.encode(payload, secret, algorithm="HS256")
@@ -29,8 +30,13 @@ headers = {"Authorization": f"Bearer {token}"}
 test_payload = {"question": "What are the main performance issues reported?"}
 
 try:
-    r = requests.post("http://localhost:8000/ask", json=test_payload, headers=headers)
-    print(f"Status: {r.status_code}")
-    print(f"Response: {r.text[:500]}")  # First 500 chars
+    # Stream so only the 500-byte preview is read and decoded, not the whole answer
+    # (decode_content=True undoes gzip before slicing, when the API has GZIP_ENABLED=true)
+    with requests.post(
+        "http://localhost:8000/ask", json=test_payload, headers=headers, stream=True
+    ) as r:
+        print(f"Status: {r.status_code}")
+        head = r.raw.read(500, decode_content=True)
+        print(f"Response: {head.decode('utf-8', 'replace')}")
 except Exception as e:
     print(f"Error: {e}")
@@ -0,0 +1,57 @@
+"""Unit tests for the EmbeddingProvider in-process vector cache.
+
+The encoder is replaced by a counting stub, so no model is loaded.
+
+Run with:
+    pytest tests/test_embedding_cache.py -v
+"""
+
+from __future__ import annotations
+
+import numpy as np
+
+from activekg.engine.embedding_provider import EmbeddingProvider
+
+
+def _provider(cache_size: int) -> tuple[EmbeddingProvider, list[list[str]]]:
+    provider = EmbeddingProvider(cache_size=cache_size)
+    calls: list[list[str]] = []
+
+    def _fake_encode(texts: list[str]) -> np.ndarray:
+        calls.append(list(texts))
+        return np.array([[float(len(t)), 1.0] for t in texts], dtype=np.float32)
+
+    provider._encode = _fake_encode  # type: ignore[method-assign]
+    return provider, calls
+
+
+class TestEmbeddingCache:
+    def test_repeat_texts_skip_encoder(self):
+        provider, calls = _provider(cache_size=8)
+        first = provider.encode(["alpha", "beta", "alpha"])
+        second = provider.encode(["beta", "gamma"])
+
+        assert calls == [["alpha", "beta"], ["gamma"]]
+        np.testing.assert_array_equal(first[0], first[2])
+        np.testing.assert_array_equal(second[0], first[1])
+
+    def test_results_do_not_alias_cache(self):
+        provider, _ = _provider(cache_size=8)
+        provider.encode(["alpha"])[0, 0] = -1.0
+        assert provider.encode(["alpha"])[0, 0] == 5.0
+
+    def test_lru_eviction(self):
+        provider, calls = _provider(cache_size=2)
+        provider.encode(["a"])
+        provider.encode(["bb"])
+        provider.encode(["a"])  # refresh "a"; "bb" is now least recent
+        provider.encode(["ccc"])
+        provider.encode(["a", "bb"])
+
+        assert calls == [["a"], ["bb"], ["ccc"], ["bb"]]
+
+    def test_disabled_by_default(self):
+        provider, calls = _provider(cache_size=0)
+        provider.encode(["alpha"])
+        provider.encode(["alpha"])
+        assert calls == [["alpha"], ["alpha"]]
@@ -1,12 +1,13 @@
 #!/usr/bin/env python3
 """Test JWT request to server."""
 
-from datetime import datetime, timedelta, timezone
+import time
 
 import jwt
 import requests
 
 # Generate token
+now = int(time.time())  # NumericDate seconds, read once for iat/nbf/exp
 payload = {
     "sub": "eval_seeder",
     "tenant_id": "eval_tenant",
@@ -14,9 +15,9 @@ payload = {
     "scopes": ["kg:write", "admin:refresh"],
     "aud": "activekg",
     "iss": "https://staging-auth.yourcompany.com",
-    "iat": datetime.now(timezone.utc),
-    "nbf": datetime.now(timezone.utc),
-    "exp": datetime.now(timezone.utc) + timedelta(hours=1),
+    "iat": now,
+    "nbf": now,
+    "exp": now + 3600,
 }
 secret = "dev-secret-key-min-32-chars-long-for-testing"
 token = jwt.encode(payload, secret, algorithm="HS256")
@@ -8,6 +8,7 @@ Run with:
 
 from __future__ import annotations
 
+from collections import OrderedDict
 from datetime import datetime, timedelta, timezone
 
 import jwt as pyjwt
@@ -328,3 +329,81 @@ class TestIssuerAudienceValidation:
             verify_jwt(token)
         assert exc_info.value.status_code == 401
         assert "sub" in exc_info.value.detail.lower() or "actor_id" in exc_info.value.detail.lower()
+
+
+# ===================================================================
+# 4. Verified-token cache
+# ===================================================================
+
+
+class TestVerifiedTokenCache:
+    @pytest.fixture(autouse=True)
+    def _enable_cache(self, monkeypatch):
+        from activekg.api import auth as auth_mod
+
+        monkeypatch.setattr(auth_mod, "JWT_CACHE_MAX", 16)
+        monkeypatch.setattr(auth_mod, "_VERIFIED_CACHE", OrderedDict())
+
+    def test_repeat_verification_skips_decode(self, monkeypatch):
+        from activekg.api import auth as auth_mod
+
+        token = _make_token(scopes=["search:read"])
+        first = auth_mod.verify_jwt(token)
+
+        def _fail(*args, **kwargs):
+            raise AssertionError("jwt.decode called for a cached token")
+
+        monkeypatch.setattr(auth_mod.jwt, "decode", _fail)
+        cached = auth_mod.verify_jwt(token)
+        assert cached is not first
+        assert (cached.tenant_id, cached.actor_id, cached.scopes, cached.exp) == (
+            first.tenant_id,
+            first.actor_id,
+            first.scopes,
+            first.exp,
+        )
+
+    def test_cached_claims_are_not_shared(self):
+        from activekg.api import auth as auth_mod
+
+        token = _make_token(scopes=["search:read"])
+        first = auth_mod.verify_jwt(token)
+        first.scopes.append("admin:refresh")
+        first.tenant_id = "t_other"
+
+        second = auth_mod.verify_jwt(token)
+        second.scopes.append("kg:write")
+
+        third = auth_mod.verify_jwt(token)
+        assert third.scopes == ["search:read"]
+        assert third.tenant_id == "t_test"
+
+    def test_changed_key_does_not_hit_cache(self, monkeypatch):
+        from activekg.api import auth as auth_mod
+
+        token = _make_token()
+        auth_mod.verify_jwt(token)
+
+        monkeypatch.setattr(auth_mod, "JWT_SECRET_KEY", "another-secret-key-minimum-32-chars!")
+        with pytest.raises(HTTPException) as exc_info:
+            auth_mod.verify_jwt(token)
+        assert exc_info.value.status_code == 401
+
+    def test_cache_disabled_always_decodes(self, monkeypatch):
+        from activekg.api import auth as auth_mod
+
+        monkeypatch.setattr(auth_mod, "JWT_CACHE_MAX", 0)
+        token = _make_token()
+        auth_mod.verify_jwt(token)
+
+        calls = []
+        real_decode = auth_mod.jwt.decode
+
+        def _counting_decode(*args, **kwargs):
+            calls.append(1)
+            return real_decode(*args, **kwargs)
+
+        monkeypatch.setattr(auth_mod.jwt, "decode", _counting_decode)
+        auth_mod.verify_jwt(token)
+        assert calls == [1]
+        assert not auth_mod._VERIFIED_CACHE
@@ -10,62 +10,82 @@ Tests:
 """
 
 import json
+import re
 import time
+from collections.abc import Iterable, Iterator
 
 import requests
+from requests.adapters import HTTPAdapter
 
+# One keep-alive connection for the baseline fetch, the purger POST and the later fetches
+SESSION = requests.Session()
+SESSION.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=4))
 
-def get_prometheus_metrics() -> str:
-    """Fetch all metrics from /prometheus endpoint."""
+
+def get_prometheus_metrics() -> Iterator[str]:
+    """Stream the /prometheus exposition text line by line (never held in memory whole)."""
     try:
-        response = requests.get("http://localhost:8000/prometheus", timeout=10)
+        response = SESSION.get("http://localhost:8000/prometheus", timeout=10, stream=True)
         response.raise_for_status()
-        return response.text
+        response.encoding = response.encoding or "utf-8"  # iter_lines yields bytes without one
+        return response.iter_lines(decode_unicode=True)
     except Exception as e:
         print(f"❌ Failed to fetch metrics: {e}")
-        return ""
+        return iter(())
+
+
+_LABEL_RE = re.compile(r'(\w+)="([^"]*)"')
+
+# metric_name -> [(labels, line)]; labels are parsed once here so lookups are dict/set ops
+Metrics = dict[str, list[tuple[dict[str, str], str]]]
+
 
+def parse_metrics(lines: Iterable[str], prefixes: tuple[str, ...] | None = None) -> Metrics:
+    """Parse Prometheus metrics lines into a dict of metric_name -> [(labels, line)].
 
-def parse_metrics(metrics_text: str) -> dict[str, list[str]]:
-    """Parse Prometheus metrics text into a dict of metric_name -> [lines]."""
-    metrics = {}
-    for line in metrics_text.split("\n"):
+    With prefixes, only metric families starting with one of them are parsed.
+    """
+    metrics: Metrics = {}
+    for line in lines:
         line = line.strip()
         if not line or line.startswith("#"):
             continue
-        # Extract metric name (before '{' or ' ')
-        if "{" in line:
-            metric_name = line.split("{")[0]
-        elif " " in line:
-            metric_name = line.split(" ")[0]
-        else:
+        if prefixes is not None and not line.startswith(prefixes):
             continue
+        # Extract metric name (before '{' or ' '); partition scans once and builds no list
+        metric_name, sep, rest = line.partition("{")
+        if sep:
+            labels = dict(_LABEL_RE.findall(rest.partition("}")[0]))
+        else:
+            metric_name, sep, _ = line.partition(" ")
+            if not sep:
+                continue
+            labels = {}
 
-        if metric_name not in metrics:
-            metrics[metric_name] = []
-        metrics[metric_name].append(line)
+        metrics.setdefault(metric_name, []).append((labels, line))
     return metrics
 
 
 def test_metric_exists(
-    metrics: dict[str, list[str]], metric_name: str, required_labels: list[str] | None = None
+    metrics: Metrics, metric_name: str, required_labels: list[str] | None = None
 ) -> bool:
     """Test if a metric exists and optionally has required labels."""
     if metric_name not in metrics:
         print(f"❌ Metric '{metric_name}' not found")
         return False
 
-    lines = metrics[metric_name]
+    series = metrics[metric_name]
+    lines = [line for _, line in series]
     print(f"✅ Metric '{metric_name}' exists ({len(lines)} time series)")
 
     if required_labels:
-        # Check if at least one line contains all required labels
-        for line in lines:
-            if all(label in line for label in required_labels):
-                print(f"   ✓ Found required labels: {required_labels}")
-                for label_line in lines:
-                    print(f"     {label_line}")
-                return True
+        # Check if at least one series carries all required labels
+        required = set(required_labels)
+        if any(required <= labels.keys() for labels, _ in series):
+            print(f"   ✓ Found required labels: {required_labels}")
+            for label_line in lines:
+                print(f"     {label_line}")
+            return True
         print(f"   ⚠️  Required labels not found: {required_labels}")
         print("   Available lines:")
         for line in lines:
@@ -80,29 +100,36 @@ def test_metric_exists(
     return True
 
 
+def _purger_success_total(metrics: Metrics) -> float | None:
+    """Value of connector_purger_total{result="success"}, or None if not exported yet."""
+    for labels, line in metrics.get("connector_purger_total", []):
+        if labels.get("result") == "success":
+            return float(line.split()[-1])
+    return None
+
+
+# The only families test_purger_endpoint reads (its baseline and its polls parse just these)
+PURGER_PREFIXES = ("connector_purger_total", "connector_purger_latency_seconds")
+
+
 def test_purger_endpoint() -> bool:
     """Test purger endpoint and verify metrics are emitted."""
     print("\n=== Testing Purger Endpoint ===")
 
     # Get baseline metrics
     print("Fetching baseline metrics...")
-    baseline = get_prometheus_metrics()
-    baseline_metrics = parse_metrics(baseline)
-
-    baseline_purger_total = 0
-    if "connector_purger_total" in baseline_metrics:
-        for line in baseline_metrics["connector_purger_total"]:
-            if 'result="success"' in line:
-                baseline_purger_total = float(line.split()[-1])
-                print(
-                    f'Baseline connector_purger_total{{result="success"}}: {baseline_purger_total}'
-                )
-                break
+    baseline_metrics = parse_metrics(get_prometheus_metrics(), PURGER_PREFIXES)
+
+    baseline_purger_total = _purger_success_total(baseline_metrics)
+    if baseline_purger_total is not None:
+        print(f'Baseline connector_purger_total{{result="success"}}: {baseline_purger_total}')
+    else:
+        baseline_purger_total = 0
 
     # Call purger endpoint
     print("\nCalling purger endpoint (dry_run=true)...")
     try:
-        response = requests.post(
+        response = SESSION.post(
             "http://localhost:8000/_admin/connectors/purge_deleted",
             json={"dry_run": True, "tenant_id": "default"},
             timeout=30,
@@ -114,30 +141,28 @@ def test_purger_endpoint() -> bool:
         print(f"❌ Purger endpoint failed: {e}")
         return False
 
-    # Wait a bit for metrics to be recorded
-    time.sleep(2)
-
-    # Get updated metrics
+    # Poll until the counter moves (usually well under 100ms), for at most 5s
     print("\nFetching updated metrics...")
-    updated = get_prometheus_metrics()
-    updated_metrics = parse_metrics(updated)
+    deadline = time.monotonic() + 5
+    while True:
+        updated_metrics = parse_metrics(get_prometheus_metrics(), PURGER_PREFIXES)
+        new_count = _purger_success_total(updated_metrics)
+        if (new_count or 0) > baseline_purger_total or time.monotonic() >= deadline:
+            break
+        time.sleep(0.05)
 
     # Check connector_purger_total incremented
     success = True
-    if "connector_purger_total" in updated_metrics:
-        for line in updated_metrics["connector_purger_total"]:
-            if 'result="success"' in line:
-                new_count = float(line.split()[-1])
-                print(f'\n✅ connector_purger_total{{result="success"}}: {new_count}')
-                if new_count > baseline_purger_total:
-                    print(f"   ✓ Metric incremented (was {baseline_purger_total})")
-                else:
-                    print(f"   ⚠️  Metric did not increment (still {baseline_purger_total})")
-                    success = False
-                break
-    else:
+    if "connector_purger_total" not in updated_metrics:
         print("❌ connector_purger_total not found in updated metrics")
         success = False
+    elif new_count is not None:
+        print(f'\n✅ connector_purger_total{{result="success"}}: {new_count}')
+        if new_count > baseline_purger_total:
+            print(f"   ✓ Metric incremented (was {baseline_purger_total})")
+        else:
+            print(f"   ⚠️  Metric did not increment (still {baseline_purger_total})")
+            success = False
 
     # Check connector_purger_latency_seconds exists
     if (
@@ -148,7 +173,7 @@ def test_purger_endpoint() -> bool:
         # Show some buckets
         if "connector_purger_latency_seconds_bucket" in updated_metrics:
             print("   Sample buckets:")
-            for line in updated_metrics["connector_purger_latency_seconds_bucket"][:3]:
+            for _, line in updated_metrics["connector_purger_latency_seconds_bucket"][:3]:
                 print(f"     {line}")
     else:
         print("❌ connector_purger_latency_seconds not found")
@@ -157,7 +182,7 @@ def test_purger_endpoint() -> bool:
     return success
 
 
-def test_rate_limiting_metrics(metrics: dict[str, list[str]]) -> bool:
+def test_rate_limiting_metrics(metrics: Metrics) -> bool:
     """Test that rate limiting metrics are defined (even if zero)."""
     print("\n=== Testing Rate Limiting Metrics ===")
     print("(Rate limiting is disabled, so these metrics may be zero or absent)")
@@ -175,7 +200,7 @@ def test_rate_limiting_metrics(metrics: dict[str, list[str]]) -> bool:
         return True  # Not a failure if rate limiting is disabled
 
 
-def test_webhook_metrics(metrics: dict[str, list[str]]) -> bool:
+def test_webhook_metrics(metrics: Metrics) -> bool:
     """Test that webhook metrics exist."""
     print("\n=== Testing Webhook Metrics ===")
     print("(These appear when webhooks are rejected due to topic ARN mismatch)")
@@ -190,7 +215,7 @@ def test_webhook_metrics(metrics: dict[str, list[str]]) -> bool:
         return True  # Not a failure if no webhooks rejected
 
 
-def test_dlq_metrics(metrics: dict[str, list[str]]) -> bool:
+def test_dlq_metrics(metrics: Metrics) -> bool:
     """Test that DLQ metrics exist."""
     print("\n=== Testing DLQ Metrics ===")
     print("(These appear when connector operations fail and go to dead letter queue)")
@@ -226,12 +251,11 @@ def main():
 
     # Fetch latest metrics for other tests
     print("\n=== Fetching All Metrics for Verification ===")
-    metrics_text = get_prometheus_metrics()
-    if not metrics_text:
+    metrics = parse_metrics(get_prometheus_metrics())
+    if not metrics:
         print("❌ Failed to fetch metrics, aborting")
         return False
 
-    metrics = parse_metrics(metrics_text)
     print(f"✅ Fetched {len(metrics)} unique metric types")
 
     # Test other metrics
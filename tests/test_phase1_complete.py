@@ -15,8 +15,11 @@ Tests all claimed Phase 1 features:
 
 import os
 import sys
+import uuid
 from datetime import datetime
 
+import pytest
+
 # Setup path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
@@ -186,6 +189,50 @@ def test_lineage(repo, node_id):
         print(f"  - Depth {ancestor['depth']}: {ancestor['id']}")
 
 
+def test_create_edges_batch(repo, node_id):
+    """Verify batch edge creation inserts every edge and rejects missing endpoints."""
+    print("\n=== Test 8b: Batch Edge Creation ===")
+    parent_ids = repo.create_nodes(
+        [Node(classes=["Source"], props={"text": f"batch parent {i}"}) for i in range(2)]
+    )
+
+    edges = [
+        Edge(src=node_id, rel="DERIVED_FROM", dst=parent_id, props={"rank": i})
+        for i, parent_id in enumerate(parent_ids)
+    ]
+    created = repo.create_edges(edges)
+    assert [(e.src, e.rel, e.dst) for e in created] == [(e.src, e.rel, e.dst) for e in edges]
+
+    lineage_ids = {ancestor["id"] for ancestor in repo.get_lineage(node_id, max_depth=1)}
+    assert set(parent_ids) <= lineage_ids, "Batch edges should be traversable"
+    print(f"✓ Created {len(created)} edges in one batch")
+
+    # One missing endpoint rejects the whole batch, including the valid edge
+    missing_id = str(uuid.uuid4())
+    with pytest.raises(ValueError, match=missing_id):
+        repo.create_edges(
+            [
+                Edge(src=node_id, rel="CITES", dst=parent_ids[0]),
+                Edge(src=node_id, rel="CITES", dst=missing_id),
+            ]
+        )
+    with repo._conn() as conn, conn.cursor() as cur:
+        cur.execute("SELECT count(*) FROM edges WHERE src = %s AND rel = 'CITES'", (node_id,))
+        assert cur.fetchone()[0] == 0, "Rejected batch should insert nothing"
+    print("✓ Batch with a nonexistent node rejected, nothing inserted")
+
+    # Malformed IDs, repeated edges and other tenants' nodes are rejected up front
+    with pytest.raises(ValueError, match="UUID"):
+        repo.create_edges([Edge(src="node_a", rel="CITES", dst=parent_ids[0])])
+    with pytest.raises(ValueError, match="Duplicate"):
+        repo.create_edges([Edge(src=node_id, rel="CITES", dst=parent_ids[0])] * 2)
+    with pytest.raises(ValueError, match="not found"):
+        repo.create_edges(
+            [Edge(src=node_id, rel="CITES", dst=parent_ids[0], tenant_id="other_tenant")]
+        )
+    print("✓ Malformed, duplicate and cross-tenant edges rejected")
+
+
 def test_api_imports():
     """Verify all API endpoints are defined."""
     print("\n=== Test 9: API Endpoints ===")
@@ -228,6 +275,7 @@ def main():
         test_refresh_scheduler(repo, embedder, trigger_engine)
         test_payload_loaders(repo)
         test_lineage(repo, node_id)
+        test_create_edges_batch(repo, node_id)
         test_api_imports()
 
         print("\n" + "=" * 60)
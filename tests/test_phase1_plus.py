@@ -68,12 +68,14 @@ def test_jsonb_compound_filter():
         },
     ]
 
-    node_ids = []
-    for data in nodes_data:
+    # One encoder call for all texts, one pipelined insert for all nodes
+    embeddings = embedder.encode([data["props"]["text"] for data in nodes_data])
+    nodes = []
+    for data, embedding in zip(nodes_data, embeddings, strict=True):
         node = Node(classes=data["classes"], props=data["props"], metadata=data["metadata"])
-        node.embedding = embedder.encode([data["props"]["text"]])[0]
-        node_id = repo.create_node(node)
-        node_ids.append(node_id)
+        node.embedding = embedding
+        nodes.append(node)
+    node_ids = repo.create_nodes(nodes)
 
     print(f"✓ Created {len(node_ids)} test nodes")
 
@@ -128,16 +130,17 @@ def test_efficient_trigger_scanning():
     print("✓ Created test pattern")
 
     # Create test nodes
-    test_nodes = []
-    for i in range(5):
+    texts = [f"Transaction {i}: wire transfer activity" for i in range(5)]
+    nodes = []
+    for text, embedding in zip(texts, embedder.encode(texts), strict=True):
         node = Node(
             classes=["Transaction"],
-            props={"text": f"Transaction {i}: wire transfer activity"},
+            props={"text": text},
             triggers=[{"name": "fraud_efficient_test", "threshold": 0.7}],
         )
-        node.embedding = embedder.encode([node.props["text"]])[0]
-        node_id = repo.create_node(node)
-        test_nodes.append(node_id)
+        node.embedding = embedding
+        nodes.append(node)
+    test_nodes = repo.create_nodes(nodes)
 
     print(f"✓ Created {len(test_nodes)} nodes with triggers")
 
@@ -179,15 +182,15 @@ def test_multi_tenant_audit_trail():
     tenant_a_node = Node(
         classes=["Document"], props={"text": "Tenant A confidential data"}, tenant_id="tenant_a"
     )
-    tenant_a_node.embedding = embedder.encode([tenant_a_node.props["text"]])[0]
-    node_a_id = repo.create_node(tenant_a_node)
-    print(f"✓ Created node for tenant_a: {node_a_id[:8]}...")
-
     tenant_b_node = Node(
         classes=["Document"], props={"text": "Tenant B confidential data"}, tenant_id="tenant_b"
     )
-    tenant_b_node.embedding = embedder.encode([tenant_b_node.props["text"]])[0]
-    node_b_id = repo.create_node(tenant_b_node)
+    tenant_a_node.embedding, tenant_b_node.embedding = embedder.encode(
+        [tenant_a_node.props["text"], tenant_b_node.props["text"]]
+    )
+    # create_nodes runs one transaction per tenant, so each insert still sees its own RLS context
+    node_a_id, node_b_id = repo.create_nodes([tenant_a_node, tenant_b_node])
+    print(f"✓ Created node for tenant_a: {node_a_id[:8]}...")
     print(f"✓ Created node for tenant_b: {node_b_id[:8]}...")
 
     # Create events with different actors
@@ -354,16 +357,17 @@ def test_admin_refresh_endpoint():
     embedder = EmbeddingProvider()
 
     # Create test nodes with refresh policy
-    test_nodes = []
-    for i in range(3):
+    texts = [f"Test document {i} for admin refresh" for i in range(3)]
+    nodes = []
+    for text, embedding in zip(texts, embedder.encode(texts), strict=True):
         node = Node(
             classes=["TestDoc"],
-            props={"text": f"Test document {i} for admin refresh"},
+            props={"text": text},
             refresh_policy={"interval": "5m", "drift_threshold": 0.1},
         )
-        node.embedding = embedder.encode([node.props["text"]])[0]
-        node_id = repo.create_node(node)
-        test_nodes.append(node_id)
+        node.embedding = embedding
+        nodes.append(node)
+    test_nodes = repo.create_nodes(nodes)
 
     print(f"✓ Created {len(test_nodes)} test nodes")
 